@@ -4,14 +4,21 @@
 
 import ctypes
 import logging
+import time
 from ctypes import wintypes
 from dataclasses import dataclass
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional, Set, Tuple
 
 logger = logging.getLogger(__name__)
 
 try:
-    from pycaw.pycaw import AudioUtilities, IAudioMeterInformation, ISimpleAudioVolume
+    from pycaw.pycaw import (
+        AudioSession,
+        AudioUtilities,
+        IAudioMeterInformation,
+        IAudioSessionControl2,
+        ISimpleAudioVolume,
+    )
 
     PYCAW_AVAILABLE = True
 except ImportError:
@@ -27,6 +34,100 @@ except ImportError:
     logger.warning("psutil not available - process detection disabled")
 
 
+PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+
+_kernel32 = None
+_psapi = None
+
+
+def _get_kernel32():
+    """Load kernel32 with prototypes for the process name lookup (lazily)"""
+    global _kernel32
+    if _kernel32 is None:
+        k32 = ctypes.WinDLL("kernel32")
+        k32.OpenProcess.argtypes = [wintypes.DWORD, wintypes.BOOL, wintypes.DWORD]
+        k32.OpenProcess.restype = wintypes.HANDLE
+        k32.QueryFullProcessImageNameW.argtypes = [
+            wintypes.HANDLE,
+            wintypes.DWORD,
+            wintypes.LPWSTR,
+            ctypes.POINTER(wintypes.DWORD),
+        ]
+        k32.QueryFullProcessImageNameW.restype = wintypes.BOOL
+        k32.CloseHandle.argtypes = [wintypes.HANDLE]
+        k32.CloseHandle.restype = wintypes.BOOL
+        _kernel32 = k32
+    return _kernel32
+
+
+def _get_psapi():
+    """Load psapi with the EnumProcesses prototype (lazily)"""
+    global _psapi
+    if _psapi is None:
+        psapi = ctypes.WinDLL("psapi")
+        psapi.EnumProcesses.argtypes = [
+            ctypes.POINTER(wintypes.DWORD),
+            wintypes.DWORD,
+            ctypes.POINTER(wintypes.DWORD),
+        ]
+        psapi.EnumProcesses.restype = wintypes.BOOL
+        _psapi = psapi
+    return _psapi
+
+
+def _pid_image_name(pid: int, buf=None) -> str:
+    """Get the .exe name of a process, case preserved ("" if it can't be queried)"""
+    k32 = _get_kernel32()
+    handle = k32.OpenProcess(PROCESS_QUERY_LIMITED_INFORMATION, False, pid)
+    if not handle:
+        return ""
+    try:
+        if buf is None:
+            buf = ctypes.create_unicode_buffer(1024)
+        size = wintypes.DWORD(len(buf))
+        if not k32.QueryFullProcessImageNameW(handle, 0, buf, ctypes.byref(size)):
+            return ""
+    finally:
+        k32.CloseHandle(handle)
+    return buf.value.rsplit("\\", 1)[-1]
+
+
+def _pid_name(pid: int) -> str:
+    """Get the lowercase .exe name of a process ("" if it can't be queried)
+
+    Much cheaper than psutil.Process(pid).name(), which builds a full
+    Process object just to read the name.
+    """
+    return _pid_image_name(pid).lower()
+
+
+def get_process_names() -> List[str]:
+    """Get the .exe names of all running processes (EnumProcesses, no psutil)
+
+    Processes that can't be queried (exited, protected) are skipped.
+    """
+    psapi = _get_psapi()
+    count = 1024
+    while True:
+        pids = (wintypes.DWORD * count)()
+        needed = wintypes.DWORD()
+        if not psapi.EnumProcesses(pids, ctypes.sizeof(pids), ctypes.byref(needed)):
+            raise ctypes.WinError()
+        returned = needed.value // ctypes.sizeof(wintypes.DWORD)
+        if returned < count:
+            break
+        count *= 2  # Buffer was filled - there may be more PIDs
+
+    buf = ctypes.create_unicode_buffer(1024)
+    names = []
+    for pid in pids[:returned]:
+        if pid:  # Skip the System Idle Process
+            name = _pid_image_name(pid, buf)
+            if name:
+                names.append(name)
+    return names
+
+
 @dataclass
 class AudioApp:
     """Info about an app with an audio session"""
@@ -50,52 +151,113 @@ class AudioDetector:
         "winamp.exe": "Winamp",
         "aimp.exe": "AIMP",
     }
+    # Lowercase exe names only, for fast membership checks in the poll loop
+    DETECT_APP_EXES = frozenset(DETECT_APPS)
+
+    # How long the running-process pre-check result is reused (seconds)
+    PROCESS_CHECK_TTL = 1.0
+
+    # How long the audio session manager interface is reused (seconds) -
+    # re-acquired periodically so default output device changes are picked up
+    SESSION_MANAGER_TTL = 5.0
 
     def __init__(self):
         self._last_detected: Dict[str, AudioApp] = {}
+        # Per-session cache: instance identifier -> (pid, app_name, volume_ctl, meter)
+        # Interfaces are only queried once per session; non-target sessions are
+        # cached with None interfaces so we never look up their process name again
+        self._session_cache: Dict[str, Tuple[int, str, Any, Any]] = {}
+        # Memoized "is any target app running" check (refreshed at most once per TTL)
+        self._targets_running = True
+        self._proc_cache_ts = 0.0
+        # IAudioSessionManager2 for the default device (see _get_sessions)
+        self._session_manager = None
+        self._session_manager_ts = 0.0
 
     @property
     def is_available(self) -> bool:
         return PYCAW_AVAILABLE
 
+    def _any_target_running(self) -> bool:
+        """Cheap check whether any DETECT_APPS process is running at all"""
+        if not PSUTIL_AVAILABLE:
+            return True  # Can't tell - let the audio session scan decide
+
+        now = time.monotonic()
+        if now - self._proc_cache_ts < self.PROCESS_CHECK_TTL:
+            return self._targets_running
+
+        try:
+            running = {
+                p.info["name"].lower()
+                for p in psutil.process_iter(["name"])
+                if p.info["name"]
+            }
+            self._targets_running = not running.isdisjoint(self.DETECT_APP_EXES)
+        except Exception as e:
+            logger.debug("Error checking running processes: %s", e)
+            self._targets_running = True
+        self._proc_cache_ts = now
+        return self._targets_running
+
     def detect_playing_apps(self) -> List[AudioApp]:
         """Detect apps that are currently playing audio"""
         if not PYCAW_AVAILABLE:
             return []
 
+        # Skip the COM session enumeration when none of our apps are running
+        if not self._any_target_running():
+            self._session_cache.clear()
+            return []
+
         playing_apps = []
 
         try:
-            sessions = AudioUtilities.GetAllSessions()
+            sessions = self._get_sessions()
+            current_keys = set()
 
             for session in sessions:
-                if not session.Process:
+                pid = session.ProcessId
+                if not pid:
                     continue
 
-                proc_name = session.Process.name().lower()
+                try:
+                    key = session.InstanceIdentifier or f"pid-{pid}"
+                except Exception:
+                    key = f"pid-{pid}"
+                current_keys.add(key)
+
+                cached = self._session_cache.get(key)
+                if cached is None:
+                    cached = self._cache_session(key, session, pid)
+                    if cached is None:
+                        continue
+
+                pid, app_name, volume_ctl, meter = cached
 
-                # Check if it's an app we care about
-                if proc_name not in self.DETECT_APPS:
+                # Not an app we care about (cached negative result)
+                if volume_ctl is None:
                     continue
 
                 try:
                     # Get volume info
-                    volume_ctl = session._ctl.QueryInterface(ISimpleAudioVolume)
                     volume = volume_ctl.GetMasterVolume()
                     muted = volume_ctl.GetMute()
 
                     # Check if actually producing audio (audio meter)
-                    try:
-                        meter = session._ctl.QueryInterface(IAudioMeterInformation)
-                        peak = meter.GetPeakValue()
-                        is_playing = peak > 0.001  # Small threshold
-                    except Exception:
-                        # If meter fails, assume playing if not muted
+                    if meter is not None:
+                        try:
+                            peak = meter.GetPeakValue()
+                            is_playing = peak > 0.001  # Small threshold
+                        except Exception:
+                            # If meter fails, assume playing if not muted
+                            is_playing = not muted and volume > 0
+                    else:
                         is_playing = not muted and volume > 0
 
                     app = AudioApp(
-                        pid=session.Process.pid,
-                        name=self.DETECT_APPS.get(proc_name, proc_name),
+                        pid=pid,
+                        name=app_name,
                         volume=volume,
                         muted=muted,
                         is_playing=is_playing,
@@ -103,16 +265,93 @@ class AudioDetector:
 
                     if is_playing:
                         playing_apps.append(app)
-                        logger.debug(f"Audio playing: {app.name} (PID {app.pid})")
+                        logger.debug("Audio playing: %s (PID %s)", app.name, app.pid)
 
                 except Exception as e:
-                    logger.debug(f"Error checking audio session {proc_name}: {e}")
+                    # Interface went stale - drop it so it's re-queried next poll
+                    self._session_cache.pop(key, None)
+                    logger.debug("Error checking audio session %s: %s", app_name, e)
+
+            # Drop sessions that no longer exist
+            for key in self._session_cache.keys() - current_keys:
+                del self._session_cache[key]
 
         except Exception as e:
-            logger.error(f"Error detecting audio sessions: {e}")
+            logger.error("Error detecting audio sessions: %s", e)
 
         return playing_apps
 
+    def _get_sessions(self) -> list:
+        """Enumerate audio sessions (like AudioUtilities.GetAllSessions)
+
+        Reuses the session manager interface instead of looking up the
+        default device and activating a new manager on every poll.
+        """
+        now = time.monotonic()
+        if (
+            self._session_manager is None
+            or now - self._session_manager_ts > self.SESSION_MANAGER_TTL
+        ):
+            self._session_manager = AudioUtilities.GetAudioSessionManager()
+            self._session_manager_ts = now
+        if self._session_manager is None:
+            return []
+
+        try:
+            enumerator = self._session_manager.GetSessionEnumerator()
+        except Exception:
+            self._session_manager = None  # Re-acquire on next poll
+            raise
+
+        sessions = []
+        for i in range(enumerator.GetCount()):
+            ctl = enumerator.GetSession(i)
+            if ctl is None:
+                continue
+            ctl2 = ctl.QueryInterface(IAudioSessionControl2)
+            if ctl2 is not None:
+                sessions.append(AudioSession(ctl2))
+        return sessions
+
+    def _cache_session(
+        self, key: str, session, pid: int
+    ) -> Optional[Tuple[int, str, Any, Any]]:
+        """Resolve process name and query interfaces for a newly seen session"""
+        try:
+            proc_name = _pid_name(pid)
+        except Exception:
+            proc_name = ""
+
+        if not proc_name:
+            # Fall back to psutil (e.g. access denied for the direct query)
+            try:
+                if not session.Process:
+                    return None
+                proc_name = session.Process.name().lower()
+            except Exception:
+                return None
+
+        # Check if it's an app we care about (skip QueryInterface otherwise)
+        if proc_name not in self.DETECT_APP_EXES:
+            entry = (pid, proc_name, None, None)
+            self._session_cache[key] = entry
+            return entry
+
+        try:
+            volume_ctl = session._ctl.QueryInterface(ISimpleAudioVolume)
+        except Exception as e:
+            logger.debug("Error checking audio session %s: %s", proc_name, e)
+            return None
+
+        try:
+            meter = session._ctl.QueryInterface(IAudioMeterInformation)
+        except Exception:
+            meter = None
+
+        entry = (pid, self.DETECT_APPS[proc_name], volume_ctl, meter)
+        self._session_cache[key] = entry
+        return entry
+
     def is_spotify_playing(self) -> Optional[AudioApp]:
         """Check specifically if Spotify is playing"""
         apps = self.detect_playing_apps()
@@ -136,10 +375,94 @@ class SpotifyController:
     APPCOMMAND_MEDIA_PLAY = 46
     APPCOMMAND_MEDIA_PAUSE = 47
 
+    # Identical commands sent within this window are coalesced (seconds).
+    # Play/pause is never coalesced - two toggles aren't a duplicate.
+    COMMAND_COALESCE_WINDOW = 0.15
+
+    # Window titles longer than this are truncated (plenty for "Artist - Track")
+    TITLE_BUFFER_SIZE = 512
+
+    # Titles Spotify's windows show when no track info is available
+    GENERIC_TITLES = frozenset({"", "Spotify", "Spotify Free", "Spotify Premium"})
+
+    # Top-level window classes used by the Spotify desktop client (CEF)
+    SPOTIFY_WINDOW_CLASSES = ("Chrome_WidgetWin_0", "Chrome_WidgetWin_1")
+
+    # EnumWindows callback prototype (see _get_enum_proc_type)
+    _WNDENUMPROC = None
+
     def __init__(self):
-        self._user32 = ctypes.windll.user32
+        # Private user32 instance so our prototypes don't leak into other
+        # libraries sharing ctypes.windll.user32
+        self._user32 = ctypes.WinDLL("user32")
         self._cached_hwnd = None
         self._cached_title = None
+        self._spotify_pids: Set[int] = set()
+        self._title_buffer = ctypes.create_unicode_buffer(self.TITLE_BUFFER_SIZE)
+        self._last_command: Tuple[int, float] = (0, 0.0)  # (command, monotonic time)
+        # Reused output buffer for GetWindowThreadProcessId
+        self._pid_out = wintypes.DWORD()
+        self._pid_out_ref = ctypes.byref(self._pid_out)
+
+        # Enumeration state and callback (created once, reused for every search)
+        self._enum_result: Dict[str, Any] = {}
+        enum_proc_type = self._get_enum_proc_type()
+        self._enum_proc = enum_proc_type(self._enum_spotify_window)
+
+        self._declare_prototypes(enum_proc_type)
+
+    @classmethod
+    def _get_enum_proc_type(cls):
+        """WNDENUMPROC prototype, built once and shared by all controllers"""
+        if cls._WNDENUMPROC is None:
+            cls._WNDENUMPROC = ctypes.WINFUNCTYPE(
+                wintypes.BOOL, wintypes.HWND, wintypes.LPARAM
+            )
+        return cls._WNDENUMPROC
+
+    def _declare_prototypes(self, enum_proc_type):
+        """Declare argtypes/restype once so ctypes skips per-call type guessing"""
+        u = self._user32
+        u.IsWindow.argtypes = [wintypes.HWND]
+        u.IsWindow.restype = wintypes.BOOL
+        u.GetWindowThreadProcessId.argtypes = [
+            wintypes.HWND,
+            ctypes.POINTER(wintypes.DWORD),
+        ]
+        u.GetWindowThreadProcessId.restype = wintypes.DWORD
+        u.GetWindowTextW.argtypes = [wintypes.HWND, wintypes.LPWSTR, ctypes.c_int]
+        u.GetWindowTextW.restype = ctypes.c_int
+        u.FindWindowExW.argtypes = [
+            wintypes.HWND,
+            wintypes.HWND,
+            wintypes.LPCWSTR,
+            wintypes.LPCWSTR,
+        ]
+        u.FindWindowExW.restype = wintypes.HWND
+        u.EnumWindows.argtypes = [enum_proc_type, wintypes.LPARAM]
+        u.EnumWindows.restype = wintypes.BOOL
+        u.SendMessageW.argtypes = [
+            wintypes.HWND,
+            wintypes.UINT,
+            wintypes.WPARAM,
+            wintypes.LPARAM,
+        ]
+        u.SendMessageW.restype = wintypes.LPARAM  # LRESULT
+        u.PostMessageW.argtypes = [
+            wintypes.HWND,
+            wintypes.UINT,
+            wintypes.WPARAM,
+            wintypes.LPARAM,
+        ]
+        u.PostMessageW.restype = wintypes.BOOL
+
+    def _find_spotify_pids(self) -> Set[int]:
+        """Find the PIDs of all running Spotify processes"""
+        return {
+            p.info["pid"]
+            for p in psutil.process_iter(["pid", "name"])
+            if p.info["name"] and "spotify" in p.info["name"].lower()
+        }
 
     def _find_spotify_window(self) -> Optional[int]:
         """Find Spotify's main window handle"""
@@ -150,67 +473,36 @@ class SpotifyController:
         if self._cached_hwnd:
             # Check if window still exists
             if self._user32.IsWindow(self._cached_hwnd):
-                # Verify it's still Spotify
-                pid = ctypes.c_ulong()
+                # Verify it's still Spotify (owned by one of the known PIDs)
                 self._user32.GetWindowThreadProcessId(
-                    self._cached_hwnd, ctypes.byref(pid)
+                    self._cached_hwnd, self._pid_out_ref
                 )
-                try:
-                    proc = psutil.Process(pid.value)
-                    if "spotify" in proc.name().lower():
-                        return self._cached_hwnd
-                except Exception:
-                    pass
+                if self._pid_out.value in self._spotify_pids:
+                    return self._cached_hwnd
             # Cache invalid, clear it
             self._cached_hwnd = None
             self._cached_title = None
 
-        # Search for Spotify window
-        result = {"hwnd": None, "title": None, "fallback_hwnd": None}
-
-        def callback(hwnd, lParam):
-            # Get process ID
-            pid = ctypes.c_ulong()
-            self._user32.GetWindowThreadProcessId(hwnd, ctypes.byref(pid))
+        # Find Spotify's processes once, so other apps' windows are ruled out
+        # with a set lookup instead of a process query per window
+        try:
+            self._spotify_pids = self._find_spotify_pids()
+        except Exception as e:
+            logger.debug("Error finding Spotify processes: %s", e)
+            self._spotify_pids = set()
+        if not self._spotify_pids:
+            return None
 
-            try:
-                proc = psutil.Process(pid.value)
-                if "spotify" not in proc.name().lower():
-                    return True
-            except Exception:
-                return True
-
-            # Get title
-            length = self._user32.GetWindowTextLengthW(hwnd)
-            if length > 0:
-                buff = ctypes.create_unicode_buffer(length + 1)
-                self._user32.GetWindowTextW(hwnd, buff, length + 1)
-                title = buff.value
-
-                # Prefer main window with "Artist - Track" format
-                if " - " in title and title not in [
-                    "Spotify",
-                    "Spotify Free",
-                    "Spotify Premium",
-                ]:
-                    result["hwnd"] = hwnd
-                    result["title"] = title
-                    return False  # Stop enumeration
-                elif (
-                    not result["fallback_hwnd"]
-                    and title
-                    and title not in ["Spotify", "Spotify Free", "Spotify Premium", ""]
-                ):
-                    # Fallback: any window with a title (might be paused/minimized)
-                    result["fallback_hwnd"] = hwnd
-            elif not result["fallback_hwnd"]:
-                # Last resort: any Spotify window (even without title)
-                result["fallback_hwnd"] = hwnd
+        # Search for Spotify window
+        result = self._enum_result
+        result.update(hwnd=None, title=None, fallback_hwnd=None)
 
-            return True
+        # Fast path: probe Spotify's known top-level window classes directly
+        self._probe_window_classes()
 
-        WNDENUMPROC = ctypes.WINFUNCTYPE(ctypes.c_bool, wintypes.HWND, wintypes.LPARAM)
-        self._user32.EnumWindows(WNDENUMPROC(callback), 0)
+        # Slow path: enumerate top-level windows, skipping other processes'
+        if not result["hwnd"]:
+            self._user32.EnumWindows(self._enum_proc, 0)
 
         # Use best match
         hwnd = result["hwnd"] or result["fallback_hwnd"]
@@ -218,17 +510,107 @@ class SpotifyController:
         self._cached_title = result["title"]
         return hwnd
 
+    def _enum_spotify_window(self, hwnd, lParam):
+        """EnumWindows callback - passes Spotify's own windows to _enum_windows_callback"""
+        self._user32.GetWindowThreadProcessId(hwnd, self._pid_out_ref)
+        if self._pid_out.value not in self._spotify_pids:
+            return True
+        return self._enum_windows_callback(hwnd, lParam)
+
+    def _probe_window_classes(self):
+        """Check windows of Spotify's known classes (records matches in _enum_result)"""
+        for class_name in self.SPOTIFY_WINDOW_CLASSES:
+            hwnd = None
+            while True:
+                hwnd = self._user32.FindWindowExW(None, hwnd, class_name, None)
+                if not hwnd:
+                    break
+                self._user32.GetWindowThreadProcessId(hwnd, self._pid_out_ref)
+                if self._pid_out.value not in self._spotify_pids:
+                    continue  # Same class, different app (Chromium-based)
+                if not self._enum_windows_callback(hwnd, 0):
+                    return  # Found the main window
+
+    def _enum_windows_callback(self, hwnd, lParam):
+        """Check one Spotify-owned window - records the best Spotify window"""
+        result = self._enum_result
+
+        # Get title (single call into the reused buffer - longer titles
+        # are truncated, which is fine for "Artist - Track" parsing)
+        length = self._user32.GetWindowTextW(
+            hwnd, self._title_buffer, self.TITLE_BUFFER_SIZE
+        )
+        if length > 0:
+            title = self._title_buffer.value
+
+            # Prefer main window with "Artist - Track" format
+            if " - " in title and title not in self.GENERIC_TITLES:
+                result["hwnd"] = hwnd
+                result["title"] = title
+                return False  # Stop enumeration
+            elif (
+                not result["fallback_hwnd"]
+                and title
+                and title not in self.GENERIC_TITLES
+            ):
+                # Fallback: any window with a title (might be paused/minimized)
+                result["fallback_hwnd"] = hwnd
+        elif not result["fallback_hwnd"]:
+            # Last resort: any Spotify window (even without title)
+            result["fallback_hwnd"] = hwnd
+
+        return True
+
+    def _is_duplicate_command(self, command: int) -> bool:
+        """Check if the same command was just sent successfully (coalesces rapid repeats)"""
+        if command == self.APPCOMMAND_MEDIA_PLAY_PAUSE:
+            return False
+        last_command, last_time = self._last_command
+        if (
+            command == last_command
+            and time.monotonic() - last_time < self.COMMAND_COALESCE_WINDOW
+        ):
+            logger.debug("Coalesced duplicate command %s", command)
+            return True
+        return False
+
+    def _record_command(self, command: int, sent: bool) -> bool:
+        """Remember a successfully sent command for coalescing; returns sent"""
+        if sent:
+            self._last_command = (command, time.monotonic())
+        return sent
+
     def _send_command(self, command: int) -> bool:
-        """Send WM_APPCOMMAND to Spotify window"""
+        """Post WM_APPCOMMAND to Spotify window (fire-and-forget)"""
+        hwnd = self._find_spotify_window()
+        if not hwnd:
+            logger.warning("Spotify window not found")
+            return False
+
+        if self._is_duplicate_command(command):
+            return True
+
+        # PostMessageW returns immediately instead of blocking until
+        # Spotify's message loop gets around to handling the command
+        lParam = command << 16
+        result = self._user32.PostMessageW(hwnd, self.WM_APPCOMMAND, hwnd, lParam)
+        logger.debug("Posted command %s to Spotify, result: %s", command, result)
+        return self._record_command(command, bool(result))
+
+    def _send_command_sync(self, command: int) -> bool:
+        """Send WM_APPCOMMAND and wait for the reply (True if Spotify handled it)"""
         hwnd = self._find_spotify_window()
         if not hwnd:
             logger.warning("Spotify window not found")
             return False
 
+        if self._is_duplicate_command(command):
+            return True
+
         lParam = command << 16
         result = self._user32.SendMessageW(hwnd, self.WM_APPCOMMAND, hwnd, lParam)
-        logger.debug(f"Sent command {command} to Spotify, result: {result}")
-        return result != 0
+        logger.debug("Sent command %s to Spotify, result: %s", command, result)
+        return self._record_command(command, result != 0)
 
     def play_pause(self) -> bool:
         """Toggle play/pause"""
@@ -243,17 +625,18 @@ class SpotifyController:
             logger.error("Spotify: window not found!")
             return False
 
-        logger.info(f"Spotify: window found: {hwnd}, trying play command")
+        logger.info("Spotify: window found: %s, trying play command", hwnd)
         # Try explicit play first, fall back to play/pause toggle
-        result1 = self._send_command(self.APPCOMMAND_MEDIA_PLAY)
-        logger.info(f"Spotify: APPCOMMAND_MEDIA_PLAY result: {result1}")
+        # (needs the reply code to know whether Spotify handled it)
+        result1 = self._send_command_sync(self.APPCOMMAND_MEDIA_PLAY)
+        logger.info("Spotify: APPCOMMAND_MEDIA_PLAY result: %s", result1)
 
         if not result1:
             # If explicit play doesn't work, use play/pause toggle
             # This works because if paused, play/pause will resume
             logger.info("Spotify: Play command not handled, trying play/pause toggle")
             result2 = self._send_command(self.APPCOMMAND_MEDIA_PLAY_PAUSE)
-            logger.info(f"Spotify: APPCOMMAND_MEDIA_PLAY_PAUSE result: {result2}")
+            logger.info("Spotify: APPCOMMAND_MEDIA_PLAY_PAUSE result: %s", result2)
             return result2
         return True
 
@@ -261,7 +644,7 @@ class SpotifyController:
         """Pause playback"""
         logger.info("Spotify: pause")
         # Try pause first, fall back to play_pause
-        if not self._send_command(self.APPCOMMAND_MEDIA_PAUSE):
+        if not self._send_command_sync(self.APPCOMMAND_MEDIA_PAUSE):
             return self._send_command(self.APPCOMMAND_MEDIA_PLAY_PAUSE)
         return True
 
@@ -278,10 +661,20 @@ class SpotifyController:
     def get_current_track(self) -> Optional[dict]:
         """Get current track info from window title"""
         hwnd = self._find_spotify_window()
-        if not hwnd or not self._cached_title:
+        if not hwnd:
+            return None
+
+        # The cached window outlives track changes (and a fallback window may
+        # have started showing a track since) - read its title now
+        if self._user32.GetWindowTextW(hwnd, self._title_buffer, self.TITLE_BUFFER_SIZE) > 0:
+            title = self._title_buffer.value
+        else:
+            title = ""
+        if " - " not in title or title in self.GENERIC_TITLES:
+            self._cached_title = None
             return None
+        self._cached_title = title
 
-        title = self._cached_title
         # Parse "Artist - Track" format
         if " - " in title:
             parts = title.split(" - ", 1)
@@ -299,11 +692,23 @@ MediaKeyController = SpotifyController
 
 def get_spotify_window_title() -> Optional[str]:
     """Get Spotify window title (contains current track info)"""
-    controller = SpotifyController()
+    controller = get_spotify_controller()
     track = controller.get_current_track()
     return track.get("full_title") if track else None
 
 
+# Singleton detector instance (keeps the session cache alive between polls)
+_audio_detector: Optional[AudioDetector] = None
+
+
+def get_audio_detector() -> AudioDetector:
+    """Get the audio detector singleton"""
+    global _audio_detector
+    if _audio_detector is None:
+        _audio_detector = AudioDetector()
+    return _audio_detector
+
+
 # Singleton controller instance
 _spotify_controller: Optional[SpotifyController] = None
 
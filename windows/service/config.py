@@ -9,6 +9,7 @@ VERSION = "1.0.0"
 # WebSocket server configuration
 WEBSOCKET_HOST = "127.0.0.1"
 WEBSOCKET_PORT = 42089
+WS_SLOW_CLIENT_BUFFER = 1024 * 1024  # bytes - unsent backlog at which a client is dropped
 
 # Installation paths
 APP_NAME = "AutoStopMedia"
@@ -23,6 +24,12 @@ LOG_RETENTION_DAYS = 7  # Keep logs for 7 days
 # Watchdog configuration
 WATCHDOG_CHECK_INTERVAL = 30  # seconds
 MEDIA_POLL_INTERVAL = 0.5  # seconds - how often to check for media changes
+MEDIA_POLL_IDLE_INTERVAL = 5.0  # seconds - fallback poll rate when idle (WinRT events wake it early)
+MEDIA_WINRT_WORKERS = 8  # threads shared by blocking WinRT session queries
+MEDIA_WINRT_STUCK_LIMIT = 4  # hung (timed-out) calls before that pool is replaced
+STATE_BROADCAST_DEBOUNCE = 0.05  # seconds - coalesce bursts of state changes
+RESTART_MAX_DELAY = 60  # seconds - cap for the exponential restart backoff
+RESTART_RESET_AFTER = 60  # seconds - a run this long resets the backoff
 
 
 # Message types (must match extension constants)
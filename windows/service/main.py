@@ -2,64 +2,181 @@
 # Runs as a background service with logging, watchdog, and tray icon
 
 import asyncio
+import copy
 import logging
 import logging.handlers
 import os
+import queue
+import random
+import re
 import signal
 import sys
+import threading
 import time
-from datetime import datetime, timedelta
-from pathlib import Path
+from collections import deque
+from datetime import datetime
+from time import perf_counter
+from typing import Optional
 
 from config import (
     LOG_DIR,
     LOG_FILE_PREFIX,
     LOG_MAX_SIZE,
     LOG_RETENTION_DAYS,
+    RESTART_MAX_DELAY,
+    RESTART_RESET_AFTER,
+    STATE_BROADCAST_DEBOUNCE,
     VERSION,
     WATCHDOG_CHECK_INTERVAL,
     WEBSOCKET_PORT,
 )
-from media_manager import WindowsMediaManager
-from tray_icon import TRAY_AVAILABLE, get_tray_icon
-from websocket_server import WebSocketServer
 
-# Add service directory to path for imports
-SERVICE_DIR = Path(__file__).parent
-sys.path.insert(0, str(SERVICE_DIR))
+logger = logging.getLogger(__name__)
 
+# Plain-string log directory for the os.* calls in cleanup_old_logs()
+LOG_DIR_STR = os.fspath(LOG_DIR)
+_LOG_DATE_RE = re.compile(r"\d{4}-\d{2}-\d{2}")  # YYYY-MM-DD in a log file name
 
 _logging_configured = False
+_log_listener: Optional["FlushingQueueListener"] = None
+
+
+class CachedTimeFormatter(logging.Formatter):
+    """Formatter that reuses the formatted timestamp for records in the same second
+
+    The date format has no sub-second part, so every record within a second
+    gets an identical asctime - no need to localtime/strftime each one.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._cached_time = (None, "")  # (whole second, formatted string)
+
+    def formatTime(self, record, datefmt=None):
+        second = int(record.created)
+        cached_second, cached_str = self._cached_time
+        if second == cached_second:
+            return cached_str
+        formatted = super().formatTime(record, datefmt)
+        self._cached_time = (second, formatted)
+        return formatted
+
+
+class BufferedRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """RotatingFileHandler that buffers writes and checks the size every N records
+
+    The base class flushes after every record and seeks to the end of the
+    file to check its size. This one only runs behind FlushingQueueListener,
+    which flushes it whenever the queue drains, so bursts become one write
+    and nothing stays buffered while the service is idle.
+    """
+
+    BUFFER_SIZE = 64 * 1024
+    ROLLOVER_CHECK_EVERY = 64  # records (file may overshoot maxBytes slightly)
+
+    def __init__(self, *args, **kwargs):
+        self._records_since_check = 0
+        super().__init__(*args, **kwargs)
+
+    def _open(self):
+        return open(
+            self.baseFilename,
+            self.mode,
+            buffering=self.BUFFER_SIZE,
+            encoding=self.encoding,
+            errors=self.errors,
+        )
+
+    def flush(self):
+        """Per-record flush is skipped - see flush_buffer()"""
+
+    def flush_buffer(self):
+        """Write buffered records to disk"""
+        super().flush()
+
+    def shouldRollover(self, record):
+        self._records_since_check += 1
+        if self._records_since_check < self.ROLLOVER_CHECK_EVERY:
+            return False
+        self._records_since_check = 0
+        return super().shouldRollover(record)
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that leaves traceback formatting to the listener thread
+
+    The base prepare() renders the record, including any exc_info traceback,
+    on the thread that logged it. Here only the message arguments are merged;
+    the listener's formatter renders the traceback.
+    """
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        return record
+
+
+class FlushingQueueListener(logging.handlers.QueueListener):
+    """QueueListener that flushes buffered handlers whenever the queue runs empty"""
+
+    def dequeue(self, block):
+        try:
+            return self.queue.get(block=False)
+        except queue.Empty:
+            self.flush_buffers()
+            return self.queue.get(block)
+
+    def flush_buffers(self):
+        for handler in self.handlers:
+            if isinstance(handler, BufferedRotatingFileHandler):
+                handler.flush_buffer()
 
 
 def cleanup_old_logs():
     """Delete log files older than LOG_RETENTION_DAYS"""
     try:
-        if not LOG_DIR.exists():
+        if not os.path.isdir(LOG_DIR_STR):
             return
 
-        cutoff_date = datetime.now() - timedelta(days=LOG_RETENTION_DAYS)
+        cutoff_ts = time.time() - LOG_RETENTION_DAYS * 24 * 60 * 60
+        cutoff_date = time.strftime("%Y-%m-%d", time.localtime(cutoff_ts))
+        prefix = LOG_FILE_PREFIX + "-"
+        date_start, date_end = len(prefix), len(prefix) + 10
         deleted_count = 0
 
-        for log_file in LOG_DIR.glob(f"{LOG_FILE_PREFIX}-*.log*"):
+        # Single scandir pass: service-YYYY-MM-DD.log, service-YYYY-MM-DD.log.1, ...
+        # are matched by name and aged by mtime (last write wins). Sorted by
+        # name the dated ones are in date order, so their scan can stop at the
+        # first one named after a day later than the cutoff day - it (and
+        # everything after it) was created, and so last written, after the
+        # cutoff. Files without a date in the name are all aged by mtime.
+        dated, undated = [], []
+        with os.scandir(LOG_DIR_STR) as entries:
+            for e in entries:
+                if e.name.startswith(prefix) and ".log" in e.name:
+                    if _LOG_DATE_RE.fullmatch(e.name, date_start, date_end):
+                        dated.append(e)
+                    else:
+                        undated.append(e)
+        dated.sort(key=lambda e: e.name)
+
+        def delete_if_old(entry) -> bool:
             try:
-                # Try to parse date from filename (service-YYYY-MM-DD.log or service-YYYY-MM-DD.log.1)
-                filename = log_file.stem  # Get name without extension
-                if filename.startswith(LOG_FILE_PREFIX + "-"):
-                    date_str = filename[len(LOG_FILE_PREFIX) + 1 :].split(".")[0]
-                    file_date = datetime.strptime(date_str, "%Y-%m-%d")
-                    if file_date < cutoff_date:
-                        log_file.unlink()
-                        deleted_count += 1
-            except (ValueError, IndexError):
-                # If we can't parse the date, check file modification time
-                try:
-                    mtime = datetime.fromtimestamp(log_file.stat().st_mtime)
-                    if mtime < cutoff_date:
-                        log_file.unlink()
-                        deleted_count += 1
-                except Exception:
-                    pass
+                if entry.stat(follow_symlinks=False).st_mtime < cutoff_ts:
+                    os.unlink(entry.path)
+                    return True
+            except OSError:
+                pass
+            return False
+
+        for entry in dated:
+            if entry.name[date_start:date_end] > cutoff_date:
+                break
+            deleted_count += delete_if_old(entry)
+        for entry in undated:
+            deleted_count += delete_if_old(entry)
 
         if deleted_count > 0:
             # Use basic print since logger might not be configured yet
@@ -71,11 +188,11 @@ def cleanup_old_logs():
 
 def setup_logging():
     """Configure logging with date-based rotation"""
-    global _logging_configured
+    global _logging_configured, _log_listener
 
     # Only configure once to avoid duplicate handlers
     if _logging_configured:
-        return logging.getLogger(__name__)
+        return logger
 
     # Ensure log directory exists
     LOG_DIR.mkdir(parents=True, exist_ok=True)
@@ -84,7 +201,7 @@ def setup_logging():
     cleanup_old_logs()
 
     # Create formatter
-    formatter = logging.Formatter(
+    formatter = CachedTimeFormatter(
         "%(asctime)s [%(levelname)s] %(name)s: %(message)s", datefmt="%Y-%m-%d %H:%M:%S"
     )
 
@@ -94,7 +211,7 @@ def setup_logging():
 
     # File handler with size-based rotation (within same day)
     # When size limit is reached, it will create .1, .2, etc. backups
-    file_handler = logging.handlers.RotatingFileHandler(
+    file_handler = BufferedRotatingFileHandler(
         log_file, maxBytes=LOG_MAX_SIZE, backupCount=5, encoding="utf-8"
     )
     file_handler.setFormatter(formatter)
@@ -106,87 +223,123 @@ def setup_logging():
     console_handler.setLevel(logging.INFO)
 
     # Configure root logger
+    # Records go through a queue so file/console I/O happens on the listener
+    # thread instead of blocking the asyncio loop
+    log_queue = queue.SimpleQueue()
     root_logger = logging.getLogger()
     root_logger.setLevel(logging.DEBUG)
-    root_logger.addHandler(file_handler)
-    root_logger.addHandler(console_handler)
+    root_logger.addHandler(DeferredQueueHandler(log_queue))
+
+    _log_listener = FlushingQueueListener(
+        log_queue, file_handler, console_handler, respect_handler_level=True
+    )
+    _log_listener.start()
 
     # Reduce noise from websockets library
     logging.getLogger("websockets").setLevel(logging.WARNING)
 
     _logging_configured = True
-    return logging.getLogger(__name__)
+    return logger
+
+
+def shutdown_logging():
+    """Flush queued log records and stop the logging thread"""
+    global _log_listener
+    if _log_listener:
+        _log_listener.stop()
+        _log_listener.flush_buffers()
+        _log_listener = None
 
 
 class AutoStopService:
     """Main service class that coordinates all components"""
 
     def __init__(self):
-        self.logger = logging.getLogger(__name__)
+        # Heavy component imports (winrt, websockets) are deferred until the
+        # service is actually constructed so process startup stays cheap
+        from media_manager import WindowsMediaManager
+        from websocket_server import WebSocketServer
+
         self.media_manager = WindowsMediaManager()
         self.websocket_server = WebSocketServer(self.media_manager)
-        self._running = False
         self._shutdown_event = asyncio.Event()
-        self._last_heartbeat = time.time()
+        self._last_heartbeat = perf_counter()
         self._tray_icon = None
+        # Set when desktop media state changes; the broadcaster coalesces bursts
+        self._state_dirty = asyncio.Event()
+        self._broadcaster_task: Optional[asyncio.Task] = None
+        # Event loop the service runs on (captured in start() for other threads)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
 
     async def start(self):
         """Start all service components"""
-        self.logger.info(f"Starting Auto-Stop Media Service v{VERSION}")
-        self.logger.info(f"WebSocket port: {WEBSOCKET_PORT}")
+        logger.info(f"Starting Auto-Stop Media Service v{VERSION}")
+        logger.info(f"WebSocket port: {WEBSOCKET_PORT}")
+
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
 
-        self._running = True
+        # Start tray icon (pystray/Pillow are only imported here)
+        from tray_icon import TRAY_AVAILABLE, get_tray_icon
 
-        # Start tray icon
         if TRAY_AVAILABLE:
             self._tray_icon = get_tray_icon(on_quit=self._request_shutdown)
             self._tray_icon.start()
-            self.logger.info("Tray icon started")
+            logger.info("Tray icon started")
         else:
-            self.logger.info("Tray icon not available (pystray/Pillow not installed)")
+            logger.info("Tray icon not available (pystray/Pillow not installed)")
 
         # Start media manager
         if not self.media_manager.is_available:
-            self.logger.error(
+            logger.error(
                 "Windows Media API not available. Please install winrt packages."
             )
             return False
 
         async def on_media_state_change(state):
             """Called when desktop media state changes"""
-            await self.websocket_server.broadcast_desktop_state()
-            # Update tray icon immediately
-            self._update_tray_icon()
+            # Broadcast + tray update happen in _state_broadcaster (debounced)
+            self._state_dirty.set()
+
+        self._broadcaster_task = asyncio.create_task(self._state_broadcaster())
 
         if not await self.media_manager.start(on_state_change=on_media_state_change):
-            self.logger.error("Failed to start media manager")
+            logger.error("Failed to start media manager")
             return False
 
         # Start WebSocket server
         if not self.websocket_server.is_available:
-            self.logger.error(
+            logger.error(
                 "WebSocket library not available. Please install websockets."
             )
             return False
 
         if not await self.websocket_server.start():
-            self.logger.error("Failed to start WebSocket server")
+            logger.error("Failed to start WebSocket server")
             await self.media_manager.stop()
             return False
 
         # Set callback to update tray icon when browser media state changes
         self.websocket_server.set_tray_update_callback(self._update_tray_icon)
 
-        self.logger.info("Service started successfully")
+        logger.info("Service started successfully")
         self._update_tray_icon()
         return True
 
     async def stop(self):
         """Stop all service components"""
-        self.logger.info("Stopping service...")
-        self._running = False
+        logger.info("Stopping service...")
         self._shutdown_event.set()
 
+        if self._broadcaster_task:
+            self._broadcaster_task.cancel()
+            try:
+                await self._broadcaster_task
+            except asyncio.CancelledError:
+                pass
+            self._broadcaster_task = None
+
         # Stop tray icon
         if self._tray_icon:
             self._tray_icon.stop()
@@ -195,19 +348,32 @@ class AutoStopService:
         await self.websocket_server.stop()
         await self.media_manager.stop()
 
-        self.logger.info("Service stopped")
+        logger.info("Service stopped")
 
     def _request_shutdown(self):
         """Request shutdown from tray icon"""
-        self.logger.info("Shutdown requested from tray icon")
-        # Set the shutdown event from any thread
-        if self._shutdown_event:
-            # Use call_soon_threadsafe to set event from tray thread
+        logger.info("Shutdown requested from tray icon")
+        if threading.get_ident() == self._loop_thread_id:
+            # Already on the loop thread - no cross-thread wakeup needed
+            self._shutdown_event.set()
+        elif self._loop and self._loop.is_running():
+            # Called from the tray thread - hand the event set over to the loop
+            self._loop.call_soon_threadsafe(self._shutdown_event.set)
+
+    async def _state_broadcaster(self):
+        """Broadcast desktop state and refresh the tray, once per burst of changes"""
+        while True:
+            await self._state_dirty.wait()
+            # Let a burst of changes settle so it becomes a single broadcast
+            await asyncio.sleep(STATE_BROADCAST_DEBOUNCE)
+            self._state_dirty.clear()
+
             try:
-                loop = asyncio.get_event_loop()
-                loop.call_soon_threadsafe(self._shutdown_event.set)
-            except Exception:
-                self._shutdown_event.set()
+                state = self.media_manager.get_state()
+                await self.websocket_server.broadcast_desktop_state(state)
+                self._update_tray_icon()
+            except Exception as e:
+                logger.error(f"State broadcast error: {e}")
 
     def _update_tray_icon(self):
         """Update tray icon with current status"""
@@ -216,28 +382,25 @@ class AutoStopService:
 
         try:
             client_count = self.websocket_server.client_count
-            state = self.media_manager.get_state()
-            desktop_media = state.get("activeMedia")
+            desktop_media, _ = self.media_manager.get_summary()
             browser_media_active = self.websocket_server.browser_media_active
 
             # Check if desktop media is actually PLAYING (not just exists)
-            desktop_playing = False
-            if desktop_media is not None:
-                # Desktop media must be playing (isPlaying should be True)
-                desktop_playing = desktop_media.get("isPlaying", False)
+            desktop_playing = desktop_media is not None and desktop_media.is_playing
 
             # Media is playing if either browser or desktop media is actively playing
             has_media = browser_media_active or desktop_playing
 
+            # update_status skips any redraw whose result wouldn't change
             self._tray_icon.update_status(
                 connected_clients=client_count,
-                active_media=desktop_media
+                active_media={"title": desktop_media.title}
                 if desktop_playing
                 else ({"title": "Browser Media"} if browser_media_active else None),
                 has_any_media=has_media,
             )
         except Exception as e:
-            self.logger.debug(f"Failed to update tray icon: {e}")
+            logger.debug("Failed to update tray icon: %s", e)
 
     async def run(self):
         """Main run loop"""
@@ -262,29 +425,40 @@ class AutoStopService:
 
     async def _watchdog(self):
         """Watchdog task to monitor service health"""
-        last_cleanup = time.time()
+        last_cleanup = perf_counter()
         cleanup_interval = 24 * 60 * 60  # Run cleanup once per day
 
-        while self._running:
+        # Ticks are scheduled against absolute deadlines so time spent doing
+        # the work below doesn't accumulate as drift
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time() + WATCHDOG_CHECK_INTERVAL
+
+        while not self._shutdown_event.is_set():
             try:
-                await asyncio.sleep(WATCHDOG_CHECK_INTERVAL)
+                await asyncio.sleep(max(0, next_tick - loop.time()))
+                next_tick += WATCHDOG_CHECK_INTERVAL
+                if next_tick < loop.time():
+                    # Fell behind (e.g. system was suspended) - don't burst
+                    next_tick = loop.time() + WATCHDOG_CHECK_INTERVAL
 
                 # Log heartbeat
-                self._last_heartbeat = time.time()
+                self._last_heartbeat = perf_counter()
                 client_count = self.websocket_server.client_count
-                state = self.media_manager.get_state()
-                active_count = 1 if state.get("activeMedia") else 0
-                paused_count = len(state.get("pausedList", []))
-
-                self.logger.debug(
-                    f"Heartbeat: {client_count} clients, "
-                    f"{active_count} active, {paused_count} paused desktop media"
+                active_media, paused_count = self.media_manager.get_summary()
+                active_count = 1 if active_media else 0
+
+                logger.debug(
+                    "Heartbeat: %d clients, %d active, %d paused desktop media",
+                    client_count,
+                    active_count,
+                    paused_count,
                 )
 
-                # Periodic log cleanup (once per day)
-                if time.time() - last_cleanup > cleanup_interval:
-                    cleanup_old_logs()
-                    last_cleanup = time.time()
+                # Periodic log cleanup (once per day) - directory scan runs in
+                # a worker thread so it doesn't block the event loop
+                if perf_counter() - last_cleanup > cleanup_interval:
+                    await loop.run_in_executor(None, cleanup_old_logs)
+                    last_cleanup = perf_counter()
 
                 # Update tray icon
                 self._update_tray_icon()
@@ -292,18 +466,25 @@ class AutoStopService:
             except asyncio.CancelledError:
                 break
             except Exception as e:
-                self.logger.error(f"Watchdog error: {e}")
+                logger.error(f"Watchdog error: {e}")
 
     def handle_signal(self, signum, frame):
-        """Handle shutdown signals"""
-        self.logger.info(f"Received signal {signum}, initiating shutdown...")
+        """Handle shutdown signals installed with signal.signal (Windows)"""
+        if self._loop and self._loop.is_running():
+            # Don't log from inside the signal handler; call_soon_threadsafe
+            # also wakes the selector if it's blocked waiting for I/O
+            self._loop.call_soon_threadsafe(self._on_shutdown_signal, signum)
+        else:
+            self._shutdown_event.set()
+
+    def _on_shutdown_signal(self, signum):
+        """Start shutdown for a signal (runs on the event loop thread)"""
+        logger.info(f"Received signal {signum}, initiating shutdown...")
         self._shutdown_event.set()
 
 
 async def main():
-    """Main entry point"""
-    logger = setup_logging()
-
+    """Main entry point (logging must already be configured by the caller)"""
     logger.info("=" * 50)
     logger.info(f"Auto-Stop Media Service v{VERSION}")
     logger.info(f"Started at: {datetime.now().isoformat()}")
@@ -314,18 +495,20 @@ async def main():
 
     # Register signal handlers (Windows compatible)
     if sys.platform == "win32":
-        # On Windows, we can only handle SIGINT (Ctrl+C) and SIGTERM
+        # On Windows, we can only handle SIGINT (Ctrl+C) and SIGTERM, and the
+        # event loop doesn't support add_signal_handler
         signal.signal(signal.SIGINT, service.handle_signal)
         signal.signal(signal.SIGTERM, service.handle_signal)
     else:
-        signal.signal(signal.SIGINT, service.handle_signal)
-        signal.signal(signal.SIGTERM, service.handle_signal)
-        signal.signal(signal.SIGHUP, service.handle_signal)
+        # Dispatched by the loop itself via its wakeup fd
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM, signal.SIGHUP):
+            loop.add_signal_handler(sig, service._on_shutdown_signal, sig)
 
     try:
         exit_code = await service.run()
     except Exception as e:
-        logger.exception(f"Unhandled exception: {e}")
+        logger.error("Unhandled exception: %s", e, exc_info=True)
         exit_code = 1
     finally:
         logger.info("Service exiting")
@@ -333,18 +516,24 @@ async def main():
     return exit_code
 
 
+def _restart_delay(failures: int) -> float:
+    """Capped exponential backoff (2, 4, 8, ... 60s) with +/-20% jitter"""
+    return min(RESTART_MAX_DELAY, 2**failures) * (0.8 + 0.4 * random.random())
+
+
 def run_with_restart():
     """Run the service with automatic restart on crash (watchdog behavior)"""
-    logger = setup_logging()
     max_restarts = 5
     restart_window = 300  # 5 minutes
-    restart_times = []
+    restart_times = deque(maxlen=max_restarts)
+    failures = 0  # Consecutive failed runs (drives the backoff)
 
     while True:
         try:
             # Clean up old restart times
-            now = time.time()
-            restart_times = [t for t in restart_times if now - t < restart_window]
+            now = perf_counter()
+            while restart_times and now - restart_times[0] >= restart_window:
+                restart_times.popleft()
 
             if len(restart_times) >= max_restarts:
                 logger.error(
@@ -354,36 +543,54 @@ def run_with_restart():
 
             restart_times.append(now)
 
-            # Run the async main
-            if sys.platform == "win32":
-                # Windows needs special event loop policy
-                asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
-
+            # Run the async main (event loop policy is set once in __main__)
             exit_code = asyncio.run(main())
 
             if exit_code == 0:
                 # Clean exit
                 return 0
 
+            # A run that stayed up for a while isn't part of a crash loop
+            if perf_counter() - now > RESTART_RESET_AFTER:
+                failures = 0
+            failures += 1
+            delay = _restart_delay(failures)
             logger.warning(
-                f"Service exited with code {exit_code}. Restarting in 5 seconds..."
+                f"Service exited with code {exit_code}. Restarting in {delay:.1f} seconds..."
             )
-            time.sleep(5)
 
         except KeyboardInterrupt:
             logger.info("Keyboard interrupt received. Exiting.")
             return 0
         except Exception as e:
-            logger.exception(f"Service crashed: {e}")
-            logger.warning("Restarting in 5 seconds...")
-            time.sleep(5)
+            if perf_counter() - now > RESTART_RESET_AFTER:
+                failures = 0
+            failures += 1
+            delay = _restart_delay(failures)
+            logger.error("Service crashed: %s", e, exc_info=True)
+            logger.warning(f"Restarting in {delay:.1f} seconds...")
+
+        try:
+            time.sleep(delay)
+        except KeyboardInterrupt:
+            logger.info("Keyboard interrupt received. Exiting.")
+            return 0
 
 
 if __name__ == "__main__":
-    # Check if running with --no-restart flag (for debugging)
-    if "--no-restart" in sys.argv:
-        if sys.platform == "win32":
-            asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
-        sys.exit(asyncio.run(main()))
-    else:
-        sys.exit(run_with_restart())
+    # Configure logging (and clean up old logs) once for the whole process
+    setup_logging()
+
+    if sys.platform == "win32":
+        # Windows needs special event loop policy; set it once rather than per restart
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+
+    try:
+        # Check if running with --no-restart flag (for debugging)
+        if "--no-restart" in sys.argv:
+            exit_code = asyncio.run(main())
+        else:
+            exit_code = run_with_restart()
+    finally:
+        shutdown_logging()
+    sys.exit(exit_code)
@@ -3,10 +3,13 @@
 # Falls back to pycaw for apps that don't use Media Session API (like Spicetify)
 
 import asyncio
+import concurrent.futures
 import logging
+import random
+import re
+import time
 from dataclasses import dataclass, field
-from datetime import datetime
-from typing import Any, Callable, Dict, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 try:
     from winrt.windows.media.control import (
@@ -18,10 +21,13 @@ try:
     from winrt.windows.media.control import (
         GlobalSystemMediaTransportControlsSessionPlaybackStatus as PlaybackStatus,
     )
-    from winrt.windows.storage.streams import Buffer, DataReader, InputStreamOptions
+    from winrt.windows.storage.streams import Buffer, InputStreamOptions
 
+    # Resolved once here rather than on every playback-info poll
+    PLAYBACK_PAUSED = getattr(PlaybackStatus, "PAUSED", None)
     WINSDK_AVAILABLE = True
 except ImportError:
+    PLAYBACK_PAUSED = None
     WINSDK_AVAILABLE = False
     logging.warning("winrt packages not available - Windows media control disabled")
 
@@ -32,7 +38,7 @@ try:
     )
 
     logger = logging.getLogger(__name__)
-    logger.debug(f"audio_detector loaded, PYCAW_AVAILABLE={PYCAW_AVAILABLE}")
+    logger.debug("audio_detector loaded, PYCAW_AVAILABLE=%s", PYCAW_AVAILABLE)
 except ImportError as e:
     PYCAW_AVAILABLE = False
     AudioDetector = None
@@ -43,6 +49,35 @@ from config import ACTION
 
 logger = logging.getLogger(__name__)
 
+# Position before each capital letter except the first ("ZuneMusic" -> "Zune Music")
+CAMEL_CASE_BOUNDARY_RE = re.compile(r"(?<!^)(?=[A-Z])")
+
+# Thresholds used when diffing and pruning sessions (seconds)
+STOPPED_TIMEOUT_SECONDS = 30.0  # drop sessions stopped longer than this
+POSITION_JUMP_THRESHOLD = 10.0  # position change that counts as a skip/seek
+DURATION_CHANGE_THRESHOLD = 1.0  # duration change that counts as a new track
+
+
+def _scan_process_names() -> Dict[str, str]:
+    """Map lowercase process names (without .exe) to display names"""
+    try:
+        from audio_detector import get_process_names
+
+        names = get_process_names()
+    except Exception:
+        # Not on Windows / ctypes lookup failed - fall back to psutil
+        import psutil
+
+        names = [proc.info["name"] for proc in psutil.process_iter(["name"])]
+
+    cache = {}
+    for name in names:
+        if name:
+            exe_name = name.replace(".exe", "").replace(".EXE", "")
+            # Store mapping: lowercase name -> display name
+            cache[exe_name.lower()] = exe_name
+    return cache
+
 
 @dataclass
 class DesktopMediaInfo:
@@ -58,12 +93,51 @@ class DesktopMediaInfo:
     current_time: float = 0
     is_playing: bool = False
     playback_rate: float = 1.0
-    last_update: datetime = field(default_factory=datetime.now)
+    last_update: float = field(default_factory=time.monotonic)  # monotonic seconds
     manually_paused: bool = False  # True if user manually paused (vs ended/stopped)
+    # (status, duration, position bucket) when the metadata was last fetched
+    _fingerprint: Optional[tuple] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    # to_dict() result and the field values it was built from
+    _dict_cache: Optional[Tuple[tuple, Dict[str, Any]]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    # dedup_key() result and the (app_id, title) it was built from
+    _dedup_cache: Optional[Tuple[Tuple[str, str], tuple]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    def dedup_key(self) -> tuple:
+        """Key shared by sessions showing the same media (same app + same title)"""
+        source = (self.app_id, self.title)
+        if self._dedup_cache is None or self._dedup_cache[0] != source:
+            if self.app_id.lower() == "spotify":
+                # Spotify dedupes by normalized title only (app_id might differ
+                # between the regular session and the fallback)
+                key = ("spotify", self.title.strip().lower() if self.title else "")
+            else:
+                key = ("app", self.app_id, self.title)
+            self._dedup_cache = (source, key)
+        return self._dedup_cache[1]
 
     def to_dict(self) -> Dict[str, Any]:
-        """Convert to dictionary for JSON serialization"""
-        return {
+        """Convert to dictionary for JSON serialization (reused while unchanged)"""
+        key = (
+            self.title,
+            self.artist,
+            self.album,
+            self.cover_url,
+            self.duration,
+            self.current_time,
+            self.is_playing,
+            self.playback_rate,
+            self.manually_paused,
+        )
+        if self._dict_cache is not None and self._dict_cache[0] == key:
+            return self._dict_cache[1]
+
+        result = {
             "mediaId": self.session_id,
             "adapter": "desktop",
             "appId": self.app_id,
@@ -79,13 +153,15 @@ class DesktopMediaInfo:
             "mediaType": "audio",
             "manuallyPaused": self.manually_paused,  # True if user manually paused
         }
+        self._dict_cache = (key, result)
+        return result
 
 
 class WindowsMediaManager:
     """Manages Windows media sessions and provides control"""
 
     # Known browser app IDs to filter out
-    BROWSER_APP_IDS = {
+    BROWSER_APP_IDS = frozenset({
         "firefox",
         "firefox.exe",
         "mozilla.firefox",
@@ -103,27 +179,66 @@ class WindowsMediaManager:
         "brave.brave",
         "vivaldi",
         "vivaldi.exe",
-    }
+    })
+    # Substring match against any of the IDs above, as a single regex scan.
+    # Longest IDs first so the most specific alternative is tried first.
+    BROWSER_APP_ID_RE = re.compile(
+        "|".join(re.escape(b) for b in sorted(BROWSER_APP_IDS, key=len, reverse=True))
+    )
+    # Firefox on Windows often has a hex hash as app ID (e.g., "83C1C0F3FA8524B1")
+    HEX_APP_ID_RE = re.compile(r"[0-9A-Fa-f]{8,}")
 
     def __init__(self):
         self._manager: Optional[MediaManager] = None
         self._sessions: Dict[str, MediaSession] = {}
+        # id(session) -> (session, app ID); each property read is a WinRT call.
+        # The session is kept in the entry so its id can't be reused.
+        self._app_id_cache: Dict[int, Tuple[Any, str]] = {}
+        # Copy-on-write: never mutated once assigned, only replaced, so readers
+        # holding a reference always see a complete snapshot
         self._media_info: Dict[str, DesktopMediaInfo] = {}
+        # Last get_state() result and the to_dict() objects it was built from
+        self._state_cache: Optional[Tuple[List[Dict[str, Any]], Dict[str, Any]]] = None
         self._active_session_id: Optional[str] = None
         self._on_state_change: Optional[Callable] = None
+        # Set when state changed during a poll; one callback is made per poll
+        self._state_dirty = False
         self._running = False
         self._poll_task: Optional[asyncio.Task] = None
+        # Background pause_all_except calls started by the poll loop
+        self._pause_tasks: set = set()
+        # Shared worker pool for blocking WinRT session queries (created on demand)
+        self._executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
+        self._executor_stuck = 0  # Timed-out calls still holding one of its workers
+
+        # WinRT change events wake the poll loop early (polling stays as a
+        # safety net since events are unreliable)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake_event = asyncio.Event()
+        # session_id (None for the manager) -> [(remove_handler, token), ...]
+        self._event_tokens: Dict[Optional[str], List[Tuple[Callable, Any]]] = {}
+        # Sessions whose metadata changed since it was last fetched
+        self._props_changed: set = set()
 
         # Browser filtering
         self._registered_browser: Optional[str] = (
             None  # App ID of the browser with extension
         )
         self._browser_media_titles: set = set()  # Titles currently playing in browser
+        self._title_norm_cache: Dict[str, str] = {}  # raw title -> normalized
+        # session_id -> _is_browser_session result; depends on _registered_browser
+        self._is_browser_cache: Dict[str, bool] = {}
+        # session_id -> _is_browser_app_id result (fixed for a session's lifetime)
+        self._browser_app_id_cache: Dict[str, bool] = {}
 
         # Process name cache for .exe name lookup
         self._process_name_cache: Dict[str, str] = {}  # app_id -> exe_name
-        self._process_cache_time = 0
-        self._process_cache_ttl = 30  # Refresh every 30 seconds
+        # app_id -> friendly name; cleared whenever the process cache refreshes
+        self._app_name_cache: Dict[str, str] = {}
+        self._process_cache_time = float("-inf")  # time.monotonic() of last refresh
+        # Refresh every ~30 seconds, jittered so rebuilds don't land on a fixed beat
+        self._process_cache_ttl_range = (25, 35)
+        self._process_cache_ttl = random.uniform(*self._process_cache_ttl_range)
 
     @property
     def is_available(self) -> bool:
@@ -149,6 +264,8 @@ class WindowsMediaManager:
             self._registered_browser = browser_name or "unknown"
 
         logger.info(f"Registered browser: {self._registered_browser}")
+        # Browser classification depends on the registered browser
+        self._is_browser_cache.clear()
 
     def update_browser_media(self, title: str, is_playing: bool):
         """Update the list of media titles currently in browser"""
@@ -157,73 +274,80 @@ class WindowsMediaManager:
 
         if is_playing and normalized:
             self._browser_media_titles.add(normalized)
-            logger.debug(f"Browser media added: {normalized}")
+            logger.debug("Browser media added: %s", normalized)
         elif normalized in self._browser_media_titles:
             self._browser_media_titles.discard(normalized)
-            logger.debug(f"Browser media removed: {normalized}")
+            logger.debug("Browser media removed: %s", normalized)
 
     def _normalize_title(self, title: str) -> str:
         """Normalize a title for comparison"""
         if not title:
             return ""
-        # Lowercase and strip whitespace
-        return title.lower().strip()
+        normalized = self._title_norm_cache.get(title)
+        if normalized is None:
+            # Lowercase and strip whitespace
+            normalized = title.lower().strip()
+            # Bounded so a stream of unique titles can't grow it forever
+            if len(self._title_norm_cache) < 512:
+                self._title_norm_cache[title] = normalized
+        return normalized
 
     def _is_browser_app_id(self, app_id: str) -> bool:
         """Quick check if an app ID looks like a browser (for early filtering)"""
         if not app_id:
             return False
 
-        app_id_lower = app_id.lower()
-
-        # Check known browser app IDs
-        for browser_id in self.BROWSER_APP_IDS:
-            if browser_id in app_id_lower:
-                return True
-
-        # Firefox on Windows often has a hex hash as app ID (e.g., "83C1C0F3FA8524B1")
-        # Detect this: all hex chars, no dots/slashes, 8+ chars
-        if len(app_id) >= 8 and all(c in "0123456789ABCDEFabcdef" for c in app_id):
-            return True
-
-        return False
+        # Known browser app IDs, or a hex hash (all hex chars, 8+ chars)
+        return bool(
+            self.BROWSER_APP_ID_RE.search(app_id.lower())
+            or self.HEX_APP_ID_RE.fullmatch(app_id)
+        )
 
     def _is_browser_session(
         self, session: "MediaSession", info: "DesktopMediaInfo"
     ) -> bool:
-        """Check if a session is from the registered browser - by app ID"""
+        """Check if a session is from the registered browser - by app ID (cached)"""
+        cached = self._is_browser_cache.get(info.session_id)
+        if cached is not None:
+            return cached
+
         try:
-            app_id = session.source_app_user_model_id or ""
-            app_id_lower = app_id.lower()
+            result = self._check_browser_app_id(self._get_app_id(session))
+        except Exception as e:
+            logger.debug("Error checking browser session: %s", e)
+            return False
 
-            # Check if this is the registered browser
-            if self._registered_browser:
-                if self._registered_browser in app_id_lower:
-                    logger.debug(f"Filtering browser by app ID: {app_id}")
-                    return True
-
-            # Check known browser app IDs
-            for browser_id in self.BROWSER_APP_IDS:
-                if browser_id in app_id_lower:
-                    logger.debug(f"Filtering known browser: {app_id}")
-                    return True
-
-            # Firefox on Windows often has a hex hash as app ID (e.g., "83C1C0F3FA8524B1")
-            # Detect this: all hex chars, no dots/slashes, 8+ chars
-            if len(app_id) >= 8 and all(c in "0123456789ABCDEFabcdef" for c in app_id):
-                # This is likely a browser with a hash ID
-                # Only filter if browser is registered (we know we have a browser extension running)
-                if self._registered_browser:
-                    logger.debug(
-                        f"Filtering hex-hash app ID (likely browser): {app_id}"
-                    )
-                    return True
+        self._is_browser_cache[info.session_id] = result
+        return result
 
-            return False
+    def _check_browser_app_id(self, app_id: str) -> bool:
+        """Uncached browser check behind _is_browser_session"""
+        app_id_lower = app_id.lower()
 
-        except Exception as e:
-            logger.debug(f"Error checking browser session: {e}")
-            return False
+        # Check if this is the registered browser
+        if self._registered_browser:
+            if self._registered_browser in app_id_lower:
+                logger.debug("Filtering browser by app ID: %s", app_id)
+                return True
+
+        # Check known browser app IDs
+        if self.BROWSER_APP_ID_RE.search(app_id_lower):
+            logger.debug("Filtering known browser: %s", app_id)
+            return True
+
+        # Firefox on Windows often has a hex hash as app ID (e.g., "83C1C0F3FA8524B1")
+        # Detect this: all hex chars, no dots/slashes, 8+ chars
+        if self.HEX_APP_ID_RE.fullmatch(app_id):
+            # This is likely a browser with a hash ID
+            # Only filter if browser is registered (we know we have a browser extension running)
+            if self._registered_browser:
+                logger.debug(
+                    "Filtering hex-hash app ID (likely browser): %s",
+                    app_id,
+                )
+                return True
+
+        return False
 
     async def start(self, on_state_change: Callable = None):
         """Initialize and start monitoring media sessions"""
@@ -233,9 +357,20 @@ class WindowsMediaManager:
 
         self._on_state_change = on_state_change
         self._running = True
+        self._loop = asyncio.get_running_loop()
 
         try:
             self._manager = await MediaManager.request_async()
+            self._subscribe_events(
+                None,
+                (
+                    (self._manager.add_sessions_changed, self._manager.remove_sessions_changed),
+                    (
+                        self._manager.add_current_session_changed,
+                        self._manager.remove_current_session_changed,
+                    ),
+                ),
+            )
 
             # Get initial sessions
             await self._refresh_sessions()
@@ -259,53 +394,150 @@ class WindowsMediaManager:
                 await self._poll_task
             except asyncio.CancelledError:
                 pass
+        for task in list(self._pause_tasks):
+            task.cancel()
+        for key in list(self._event_tokens):
+            self._unsubscribe_events(key)
         self._sessions.clear()
-        self._media_info.clear()
+        self._app_id_cache.clear()
+        self._is_browser_cache.clear()
+        self._browser_app_id_cache.clear()
+        self._media_info = {}
+        self._props_changed.clear()
+        self._state_cache = None
+        if self._executor is not None:
+            # Don't wait on workers that may still be stuck in a hung WinRT call
+            self._executor.shutdown(wait=False)
+            self._executor = None
         logger.info("Windows Media Manager stopped")
 
+    def _call_in_loop(self, callback: Callable, *args) -> None:
+        """Schedule callback on the event loop from a WinRT thread (no-op once it's closed)"""
+        loop = self._loop
+        if loop and not loop.is_closed():
+            try:
+                loop.call_soon_threadsafe(callback, *args)
+            except RuntimeError:
+                pass  # Loop closed between the check and the call
+
+    def _on_winrt_event(self, sender, args):
+        """WinRT change event handler (runs on a WinRT thread) - wake the poll loop"""
+        self._call_in_loop(self._wake_event.set)
+
+    def _subscribe_events(self, key: Optional[str], events) -> None:
+        """Attach handlers to (add_handler, remove_handler[, handler]) tuples under key
+
+        The handler defaults to _on_winrt_event.
+        """
+        tokens = []
+        for add, remove, *handler in events:
+            callback = handler[0] if handler else self._on_winrt_event
+            try:
+                tokens.append((remove, add(callback)))
+            except Exception as e:
+                logger.debug("Could not subscribe to WinRT event (%s): %s", key, e)
+        self._event_tokens[key] = tokens
+
+    def _unsubscribe_events(self, key: Optional[str]) -> None:
+        """Detach the event handlers registered under key"""
+        for remove, token in self._event_tokens.pop(key, ()):
+            try:
+                remove(token)
+            except Exception:
+                pass
+
+    def _add_session(self, session_id: str, session: "MediaSession") -> None:
+        """Track a session and subscribe to its playback/timeline/metadata change events"""
+        self._sessions[session_id] = session
+
+        def on_props_changed(sender, args):
+            # Runs on a WinRT thread - flag the session for a metadata fetch
+            self._call_in_loop(self._props_changed.add, session_id)
+            self._on_winrt_event(sender, args)
+
+        self._subscribe_events(
+            session_id,
+            (
+                (session.add_playback_info_changed, session.remove_playback_info_changed),
+                (
+                    session.add_timeline_properties_changed,
+                    session.remove_timeline_properties_changed,
+                ),
+                (
+                    session.add_media_properties_changed,
+                    session.remove_media_properties_changed,
+                    on_props_changed,
+                ),
+            ),
+        )
+
+    async def _wait_for_next_poll(self, timeout: float, min_wait: float) -> bool:
+        """Sleep until the next poll; returns True if woken early by a WinRT event
+
+        An early wake still waits out min_wait - timeline events fire
+        continuously during playback and would otherwise poll back-to-back.
+        """
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        try:
+            await asyncio.wait_for(self._wake_event.wait(), timeout=timeout)
+            woken = True
+        except asyncio.TimeoutError:
+            woken = False
+        if woken:
+            remaining = min_wait - (loop.time() - started)
+            if remaining > 0:
+                await asyncio.sleep(remaining)
+        self._wake_event.clear()
+        return woken
+
     async def _refresh_sessions(self):
         """Refresh the list of media sessions"""
         if not self._manager:
             return
 
         try:
-            sessions = self._manager.get_sessions()
+            # Materialize once - the WinRT view is iterated below and counted here
+            sessions = list(self._manager.get_sessions())
 
             # Log ALL sessions Windows reports
-            session_count = 0
-            for s in sessions:
-                session_count += 1
-            logger.debug(f"Windows reports {session_count} media session(s)")
+            logger.debug("Windows reports %d media session(s)", len(sessions))
 
             # Track current session IDs
             current_ids = set()
 
             for session in sessions:
-                app_id = session.source_app_user_model_id or "unknown"
+                app_id = self._get_app_id(session) or "unknown"
                 session_id = self._get_session_id(session)
                 current_ids.add(session_id)
 
                 # Log every session we see
                 logger.debug(
-                    f"Found session: app_id='{app_id}' -> session_id='{session_id}'"
+                    "Found session: app_id='%s' -> session_id='%s'",
+                    app_id,
+                    session_id,
                 )
 
                 if session_id not in self._sessions:
-                    self._sessions[session_id] = session
+                    self._add_session(session_id, session)
                     logger.info(f"NEW session discovered: {session_id} (app: {app_id})")
 
             # Remove stale sessions
-            stale_ids = set(self._sessions.keys()) - current_ids
-            for session_id in stale_ids:
+            for session_id in list(self._sessions):
+                if session_id in current_ids:
+                    continue
                 del self._sessions[session_id]
-                if session_id in self._media_info:
-                    del self._media_info[session_id]
+                self._unsubscribe_events(session_id)
+                self._drop_media_info(session_id)
+                self._is_browser_cache.pop(session_id, None)
+                self._browser_app_id_cache.pop(session_id, None)
+                self._props_changed.discard(session_id)
                 logger.info(f"Session REMOVED: {session_id}")
 
             # Update current session (the one Windows considers "active")
             current = self._manager.get_current_session()
             if current:
-                current_app_id = current.source_app_user_model_id or "unknown"
+                current_app_id = self._get_app_id(current) or "unknown"
                 self._active_session_id = self._get_session_id(current)
                 logger.info(
                     f"Windows CURRENT/ACTIVE session: {current_app_id} -> {self._active_session_id}"
@@ -313,7 +545,7 @@ class WindowsMediaManager:
 
                 # If current session isn't in our list, add it!
                 if self._active_session_id not in self._sessions:
-                    self._sessions[self._active_session_id] = current
+                    self._add_session(self._active_session_id, current)
                     logger.info(
                         f"Added current session that wasn't in list: {self._active_session_id}"
                     )
@@ -321,51 +553,73 @@ class WindowsMediaManager:
                 self._active_session_id = None
                 logger.debug("No current/active session")
 
+            # Only keep cached app IDs for the session objects we hold on to
+            self._app_id_cache = {
+                id(s): self._app_id_cache[id(s)]
+                for s in self._sessions.values()
+                if id(s) in self._app_id_cache
+            }
+
         except Exception as e:
             logger.error(f"Error refreshing sessions: {e}")
 
+    def _get_app_id(self, session: "MediaSession") -> str:
+        """Get a session's source app ID (cached per session object)"""
+        cached = self._app_id_cache.get(id(session))
+        if cached is not None and cached[0] is session:
+            return cached[1]
+        app_id = session.source_app_user_model_id or ""
+        self._app_id_cache[id(session)] = (session, app_id)
+        return app_id
+
     def _get_session_id(self, session: "MediaSession") -> str:
         """Generate a unique ID for a session based on app ID only (dedupe by app)"""
         try:
-            source_app_id = session.source_app_user_model_id or ""
+            source_app_id = self._get_app_id(session)
             # Use just the app ID - we'll dedupe further by title in get_state()
             return f"desktop-{source_app_id}"
         except Exception:
             return f"desktop-{id(session)}"
 
-    def _refresh_process_cache(self):
-        """Refresh the process name cache"""
-        import time
-
-        now = time.time()
+    async def _refresh_process_cache(self):
+        """Refresh the process name cache (the process scan runs in a worker thread)"""
+        now = time.monotonic()
         if now - self._process_cache_time < self._process_cache_ttl:
             return  # Cache still valid
 
         try:
-            import psutil
-
-            self._process_name_cache = {}
-            for proc in psutil.process_iter(["pid", "name"]):
-                if proc.info["name"]:
-                    exe_name = proc.info["name"].replace(".exe", "").replace(".EXE", "")
-                    name_lower = exe_name.lower()
-                    # Store mapping: lowercase name -> display name
-                    self._process_name_cache[name_lower] = exe_name
+            loop = asyncio.get_running_loop()
+            self._process_name_cache = await loop.run_in_executor(
+                None, _scan_process_names
+            )
+            self._app_name_cache.clear()
             self._process_cache_time = now
+            self._process_cache_ttl = random.uniform(*self._process_cache_ttl_range)
             logger.debug(
-                f"Refreshed process cache: {len(self._process_name_cache)} processes"
+                "Refreshed process cache: %d processes",
+                len(self._process_name_cache),
             )
         except Exception as e:
-            logger.debug(f"Could not refresh process cache: {e}")
+            logger.debug("Could not refresh process cache: %s", e)
 
     def _get_app_name(self, session: "MediaSession") -> str:
         """Get a friendly app name from the session - prefer .exe name"""
         try:
-            app_id = session.source_app_user_model_id or ""
+            app_id = self._get_app_id(session)
+        except Exception as e:
+            logger.debug("Error getting app name: %s", e)
+            return "Desktop App"
 
-            # Refresh process cache if needed
-            self._refresh_process_cache()
+        # The name only depends on the app ID and the process cache
+        name = self._app_name_cache.get(app_id)
+        if name is None:
+            name = self._resolve_app_name(app_id)
+            self._app_name_cache[app_id] = name
+        return name
 
+    def _resolve_app_name(self, app_id: str) -> str:
+        """Work out a friendly app name for an app ID (see _get_app_name)"""
+        try:
             # Try to match app_id to a cached process name
             app_id_lower = app_id.lower()
 
@@ -437,10 +691,7 @@ class WindowsMediaManager:
                 clean_id = app_id.replace(".exe", "").replace(".EXE", "")
 
                 # If it's a GUID/hash (starts with { or is all hex), try to find .exe name
-                if clean_id.startswith("{") or (
-                    len(clean_id) >= 8
-                    and all(c in "0123456789ABCDEFabcdef" for c in clean_id)
-                ):
+                if clean_id.startswith("{") or self.HEX_APP_ID_RE.fullmatch(clean_id):
                     # For now, return a generic name but we could improve this
                     return "Desktop App"
 
@@ -448,11 +699,7 @@ class WindowsMediaManager:
                 if clean_id.startswith("Microsoft."):
                     parts = clean_id.split("_")[0].replace("Microsoft.", "")
                     # Convert CamelCase to spaces
-                    name = ""
-                    for c in parts:
-                        if c.isupper() and name:
-                            name += " "
-                        name += c
+                    name = CAMEL_CASE_BOUNDARY_RE.sub(" ", parts)
                     return name or "Desktop App"
 
                 # Split by . and get the last meaningful part
@@ -466,29 +713,55 @@ class WindowsMediaManager:
 
             return "Desktop App"
         except Exception as e:
-            logger.debug(f"Error getting app name: {e}")
+            logger.debug("Error getting app name: %s", e)
             return "Desktop App"
 
-    def _get_dedup_key(self, info: "DesktopMediaInfo") -> str:
-        """Get a key for deduplicating media (same app + same title = same media)"""
-        # Use app name + title to deduplicate
-        # This prevents the same song showing multiple times
-        return f"{info.app_id}:{info.title}"
+    def _set_media_info(self, session_id: str, info: DesktopMediaInfo) -> None:
+        """Publish a new _media_info with session_id set to info"""
+        media_info = dict(self._media_info)
+        media_info[session_id] = info
+        self._media_info = media_info
+
+    def _drop_media_info(self, session_id: str) -> None:
+        """Publish a new _media_info without session_id (if present)"""
+        if session_id in self._media_info:
+            media_info = dict(self._media_info)
+            del media_info[session_id]
+            self._media_info = media_info
 
     async def _poll_media_state(self):
         """Poll media state periodically"""
-        from config import MEDIA_POLL_INTERVAL
+        from config import MEDIA_POLL_IDLE_INTERVAL, MEDIA_POLL_INTERVAL
 
         poll_count = 0
         BROADCAST_EVERY_N_POLLS = (
             4  # Broadcast state every N polls even without changes
         )
+        IDLE_POLLS_BEFORE_BACKOFF = 4  # Quiet polls before slowing down
+        interval = MEDIA_POLL_INTERVAL
+        idle_polls = 0
+        loop = asyncio.get_running_loop()
+        next_poll = 0.0  # loop.time() of the next WinRT poll
         logger.info("Media polling started")
 
         while self._running:
+            # The backoff only stretches the WinRT polls; the pycaw fallback has
+            # no change events to wake us, so it keeps the MEDIA_POLL_INTERVAL ticks
+            # (half a tick of slack - asyncio timers may fire a little early)
+            full_poll = loop.time() + MEDIA_POLL_INTERVAL / 2 >= next_poll
             try:
-                await self._refresh_sessions()
-                await self._update_all_media_info()
+                changed = False
+                if full_poll:
+                    await self._refresh_sessions()
+                    changed = await self._update_all_media_info()
+
+                    # Periodically broadcast state for progress updates
+                    poll_count += 1
+                    if poll_count >= BROADCAST_EVERY_N_POLLS:
+                        poll_count = 0
+                        if self._media_info:
+                            logger.debug("Periodic state broadcast for progress updates")
+                            self._state_dirty = True
 
                 # Also check for Spotify via pycaw (fallback for Spicetify)
                 try:
@@ -496,18 +769,36 @@ class WindowsMediaManager:
                 except Exception as e:
                     logger.error(f"Spotify fallback check error: {e}", exc_info=True)
 
-                # Periodically broadcast state for progress updates
-                poll_count += 1
-                if poll_count >= BROADCAST_EVERY_N_POLLS:
-                    poll_count = 0
-                    if self._on_state_change and self._media_info:
-                        logger.debug("Periodic state broadcast for progress updates")
+                # Notify once per poll, however many changes were found
+                if self._state_dirty:
+                    self._state_dirty = False
+                    if self._on_state_change:
                         await self._on_state_change(self.get_state())
 
+                # Back off (up to MEDIA_POLL_IDLE_INTERVAL) while nothing is
+                # playing or changing; go back to full rate as soon as it is
+                if changed or any(info.is_playing for info in self._media_info.values()):
+                    idle_polls = 0
+                    interval = MEDIA_POLL_INTERVAL
+                elif full_poll:
+                    idle_polls += 1
+                    if idle_polls > IDLE_POLLS_BEFORE_BACKOFF:
+                        interval = min(interval * 2, MEDIA_POLL_IDLE_INTERVAL)
+
             except Exception as e:
                 logger.error(f"Error polling media state: {e}")
 
-            await asyncio.sleep(MEDIA_POLL_INTERVAL)
+            if full_poll:
+                next_poll = loop.time() + interval
+            else:
+                next_poll = min(next_poll, loop.time() + interval)
+
+            timeout = MEDIA_POLL_INTERVAL if PYCAW_AVAILABLE else interval
+            if await self._wait_for_next_poll(timeout, MEDIA_POLL_INTERVAL):
+                # Something changed - poll at full rate again
+                idle_polls = 0
+                interval = MEDIA_POLL_INTERVAL
+                next_poll = 0.0
 
     async def _check_spotify_fallback(self):
         """Check for Spotify playing via pycaw (for Spicetify that doesn't use Media Session API)"""
@@ -516,33 +807,31 @@ class WindowsMediaManager:
             return
 
         # Check if Spotify is already detected via Media Session API
-        # Also check by app_id in existing media_info (more reliable)
-        spotify_in_sessions = any(
-            "spotify" in sid.lower() for sid in self._sessions.keys()
-        )
-
-        # Also check if we already have a Spotify session in media_info (not fallback)
-        spotify_in_media_info = any(
+        # Also check by app_id in existing media_info (more reliable), i.e. a
+        # Spotify session in media_info that isn't the fallback. Nothing below
+        # changes either, so this is the only place it needs to be checked.
+        spotify_detected = any(
+            "spotify" in sid.lower() for sid in self._sessions
+        ) or any(
             info.app_id.lower() == "spotify"
             and not session_id.startswith("desktop-spotify-fallback")
             for session_id, info in self._media_info.items()
         )
 
-        if spotify_in_sessions or spotify_in_media_info:
+        if spotify_detected:
             # Remove fallback if it exists (regular detection is better)
             if "desktop-spotify-fallback" in self._media_info:
                 logger.debug(
                     "Removing Spotify fallback - detected via Media Session API"
                 )
-                del self._media_info["desktop-spotify-fallback"]
-                if self._on_state_change:
-                    await self._on_state_change(self.get_state())
+                self._drop_media_info("desktop-spotify-fallback")
+                self._state_dirty = True
             return  # Already detected normally
 
         try:
-            from audio_detector import AudioDetector, get_spotify_controller
+            from audio_detector import get_audio_detector, get_spotify_controller
 
-            detector = AudioDetector()
+            detector = get_audio_detector()
             spotify_app = detector.is_spotify_playing()
 
             if spotify_app:
@@ -568,9 +857,9 @@ class WindowsMediaManager:
 
                 # Try to get progress from Media Session API
                 # Spotify might appear there even if not in our sessions list
+                # (e.g. it registered since the last refresh)
                 try:
-                    manager = MediaManager.request_async().get_results()
-                    sessions = manager.get_sessions()
+                    sessions = self._manager.get_sessions() if self._manager else []
                     for session in sessions:
                         app_id = session.source_app_user_model_id or ""
                         if "spotify" in app_id.lower():
@@ -595,13 +884,15 @@ class WindowsMediaManager:
                                         )
                             except Exception as e:
                                 logger.debug(
-                                    f"Error getting timeline from Spotify session: {e}"
+                                    "Error getting timeline from Spotify session: %s",
+                                    e,
                                 )
                             break
                 except Exception as e:
                     # Can't get progress - that's okay, we'll just not show progress bar
                     logger.debug(
-                        f"Could not get Spotify progress from Media Session API: {e}"
+                        "Could not get Spotify progress from Media Session API: %s",
+                        e,
                     )
 
                 # Get or create existing info
@@ -617,7 +908,9 @@ class WindowsMediaManager:
                         old_info.current_time = current_time
                         old_info.duration = duration
                         logger.debug(
-                            f"Spotify progress update (REAL): {current_time:.1f}/{duration:.1f}"
+                            "Spotify progress update (REAL): %.1f/%.1f",
+                            current_time,
+                            duration,
                         )
                     # If no real progress, keep existing values (or set to 0 if we never had progress)
                     elif old_info.duration == 0:
@@ -626,7 +919,6 @@ class WindowsMediaManager:
                         old_info.duration = 0
 
                     old_info.is_playing = True
-                    self._media_info[session_id] = old_info
 
                     # CRITICAL: If Spotify just started playing, pause all other desktop media
                     if was_paused:
@@ -639,8 +931,7 @@ class WindowsMediaManager:
                                 f"Paused {paused_count} other desktop media session(s)"
                             )
 
-                    if self._on_state_change:
-                        await self._on_state_change(self.get_state())
+                    self._state_dirty = True
                 else:
                     # New track or new session - only set progress if we have real data
                     info = DesktopMediaInfo(
@@ -662,7 +953,7 @@ class WindowsMediaManager:
                         logger.info(
                             f"Spotify detected via fallback: {title} (no progress available)"
                         )
-                    self._media_info[session_id] = info
+                    self._set_media_info(session_id, info)
 
                     # CRITICAL: New Spotify track started - pause all other desktop media
                     logger.info(
@@ -674,94 +965,108 @@ class WindowsMediaManager:
                             f"Paused {paused_count} other desktop media session(s)"
                         )
 
-                    if self._on_state_change:
-                        await self._on_state_change(self.get_state())
+                    self._state_dirty = True
             else:
-                # Spotify not playing - check if we should keep fallback or remove it
+                # Spotify not playing - keep the fallback but mark it as paused
+                # (a regular Spotify session would have returned early above)
                 if "desktop-spotify-fallback" in self._media_info:
-                    # Check if Spotify is in regular sessions - if so, remove fallback
-                    spotify_in_sessions = any(
-                        "spotify" in sid.lower() for sid in self._sessions.keys()
-                    )
-                    spotify_in_media_info = any(
-                        info.app_id.lower() == "spotify"
-                        and not sid.startswith("desktop-spotify-fallback")
-                        for sid, info in self._media_info.items()
-                    )
-
-                    if spotify_in_sessions or spotify_in_media_info:
-                        # Remove fallback - regular session handles it
-                        logger.debug(
-                            "Removing Spotify fallback - detected in regular sessions"
-                        )
-                        del self._media_info["desktop-spotify-fallback"]
-                        if self._on_state_change:
-                            await self._on_state_change(self.get_state())
-                    else:
-                        # Keep fallback but mark as paused
-                        old_info = self._media_info["desktop-spotify-fallback"]
-                        old_info.is_playing = False
-                        old_info.manually_paused = True
-                        logger.debug("Spotify paused (fallback)")
-                        # Still broadcast update so extension knows it's paused
-                        if self._on_state_change:
-                            await self._on_state_change(self.get_state())
+                    old_info = self._media_info["desktop-spotify-fallback"]
+                    old_info.is_playing = False
+                    old_info.manually_paused = True
+                    logger.debug("Spotify paused (fallback)")
+                    # Still broadcast update so extension knows it's paused
+                    self._state_dirty = True
 
         except Exception as e:
-            logger.debug(f"Spotify fallback check error: {e}")
+            logger.debug("Spotify fallback check error: %s", e)
 
-    async def _update_all_media_info(self):
-        """Update info for all sessions and notify of changes"""
+    async def _update_all_media_info(self) -> bool:
+        """Update info for all sessions and notify of changes (returns True if changed)"""
         changed = False
         current_session_ids = set()
+        # Work on a copy and publish it in one assignment (see __init__)
+        media_info = dict(self._media_info)
 
+        # Skip browser sessions early to avoid hanging on their async calls
+        pending = []
         for session_id, session in list(self._sessions.items()):
-            try:
-                # Skip browser sessions early to avoid hanging on their async calls
-                app_id_raw = ""
+            is_browser = self._browser_app_id_cache.get(session_id)
+            if is_browser is None:
                 try:
-                    app_id_raw = session.source_app_user_model_id or ""
+                    is_browser = self._is_browser_app_id(self._get_app_id(session))
+                    self._browser_app_id_cache[session_id] = is_browser
                 except Exception:
-                    pass
-
-                if self._is_browser_app_id(app_id_raw):
-                    continue  # Skip browser sessions
+                    is_browser = False  # Not cached - retried next poll
+
+            if is_browser:
+                continue  # Skip browser sessions
+            pending.append((session_id, session))
+
+        # Refresh the process cache once up front so the concurrent fetches
+        # below don't each kick off their own scan
+        await self._refresh_process_cache()
+
+        # Query all sessions concurrently - the poll now takes as long as the
+        # slowest session rather than the sum of all of them. Each fetch keeps
+        # its own timeout so one hanging session can't block the others.
+        results = await asyncio.gather(
+            *(
+                asyncio.wait_for(
+                    self._get_media_info(session, session_id),
+                    timeout=3.0  # 3 second max per session
+                )
+                for session_id, session in pending
+            ),
+            return_exceptions=True,
+        )
 
-                # Add timeout to prevent one hanging session from blocking all others
-                try:
-                    info = await asyncio.wait_for(
-                        self._get_media_info(session, session_id),
-                        timeout=3.0  # 3 second max per session
-                    )
-                    current_session_ids.add(session_id)
-                except asyncio.TimeoutError:
+        # Apply the results in session order so diffing behaves exactly as it
+        # did when sessions were polled one at a time. Of the sessions that
+        # started playing, the last one wins and the rest get paused.
+        pause_others_for: Optional[str] = None
+        for (session_id, session), info in zip(pending, results):
+            try:
+                if isinstance(info, asyncio.TimeoutError):
                     logger.warning(f"Timeout getting media info for {session_id} - skipping")
                     continue
-                except Exception as e:
-                    logger.error(f"Error getting media info for {session_id}: {e}")
+                if isinstance(info, BaseException):
+                    if not isinstance(info, Exception):
+                        raise info
+                    logger.error(f"Error getting media info for {session_id}: {info}")
                     continue
+                current_session_ids.add(session_id)
 
                 logger.debug(
-                    f"Session {session_id}: playing={info.is_playing}, title='{info.title}', pos={info.current_time:.1f}/{info.duration:.1f}"
+                    "Session %s: playing=%s, title='%s', pos=%.1f/%.1f",
+                    session_id,
+                    info.is_playing,
+                    info.title,
+                    info.current_time,
+                    info.duration,
                 )
 
                 # Filter out browser sessions
                 if self._is_browser_session(session, info):
-                    logger.debug(f"Filtering browser session: {session_id}")
-                    if session_id in self._media_info:
-                        del self._media_info[session_id]
+                    logger.debug("Filtering browser session: %s", session_id)
+                    if session_id in media_info:
+                        del media_info[session_id]
                         changed = True
                     continue
 
                 # Check if this is a meaningful change
-                old_info = self._media_info.get(session_id)
+                old_info = media_info.get(session_id)
                 if old_info:
                     # Check for significant changes (title, playing state, duration, or large position jump)
                     title_changed = old_info.title != info.title
                     playing_changed = old_info.is_playing != info.is_playing
-                    duration_changed = abs(old_info.duration - info.duration) > 1
+                    duration_changed = (
+                        abs(old_info.duration - info.duration) > DURATION_CHANGE_THRESHOLD
+                    )
                     # Position jump detection (track skip)
-                    position_jump = abs(info.current_time - old_info.current_time) > 10
+                    position_jump = (
+                        abs(info.current_time - old_info.current_time)
+                        > POSITION_JUMP_THRESHOLD
+                    )
 
                     if (
                         title_changed
@@ -780,11 +1085,7 @@ class WindowsMediaManager:
                         logger.info(
                             f"Desktop media started playing: {session_id} - '{info.title}' - pausing other desktop media"
                         )
-                        paused_count = await self.pause_all_except(session_id)
-                        if paused_count > 0:
-                            logger.info(
-                                f"Paused {paused_count} other desktop media session(s)"
-                            )
+                        pause_others_for = session_id
                 else:
                     logger.info(f"New media session: {session_id} - '{info.title}'")
                     changed = True
@@ -794,90 +1095,126 @@ class WindowsMediaManager:
                         logger.info(
                             f"New desktop media playing: {session_id} - '{info.title}' - pausing other desktop media"
                         )
-                        paused_count = await self.pause_all_except(session_id)
-                        if paused_count > 0:
-                            logger.info(
-                                f"Paused {paused_count} other desktop media session(s)"
-                            )
+                        pause_others_for = session_id
 
-                self._media_info[session_id] = info
+                media_info[session_id] = info
 
             except Exception as e:
                 logger.error(f"Error updating session {session_id}: {e}")
 
-        # Clean up stale sessions that no longer exist
-        # Don't clean up fallback sessions (they're managed separately)
-        stale_ids = set(self._media_info.keys()) - current_session_ids
-        for stale_id in stale_ids:
-            if stale_id.startswith("desktop-spotify-fallback"):
-                continue  # Fallback session is managed by _check_spotify_fallback
-            logger.info(f"Removing stale session: {stale_id}")
-            del self._media_info[stale_id]
+        # One sweep over the sessions, rebuilding the dict without:
+        # - stale sessions that no longer exist
+        # - sessions that have been stopped for a while (STOPPED_TIMEOUT_SECONDS),
+        #   so ended media doesn't stay in the paused list forever
+        # Fallback sessions are managed by _check_spotify_fallback
+        now = time.monotonic()
+        kept: Dict[str, DesktopMediaInfo] = {}
+
+        for session_id, info in media_info.items():
+            if not session_id.startswith("desktop-spotify-fallback"):
+                if session_id not in current_session_ids:
+                    logger.info(f"Removing stale session: {session_id}")
+                    continue
+                if not info.is_playing and now - info.last_update > STOPPED_TIMEOUT_SECONDS:
+                    logger.info(
+                        f"Removing stopped session (timeout): {session_id} - '{info.title}'"
+                    )
+                    continue
+            kept[session_id] = info
+
+        if len(kept) != len(media_info):
             changed = True
+        media_info = kept
 
-        # Clean up sessions that have been stopped for a while (more than 30 seconds)
-        # This prevents ended media from staying in the paused list forever
-        from datetime import datetime, timedelta
+        self._media_info = media_info
 
-        now = datetime.now()
-        stopped_timeout = timedelta(seconds=30)
+        if pause_others_for is not None:
+            self._schedule_pause_all_except(pause_others_for)
 
-        for session_id, info in list(self._media_info.items()):
-            if session_id.startswith("desktop-spotify-fallback"):
-                continue  # Fallback session is managed separately
+        if changed:
+            logger.debug("Broadcasting state change: %d sessions", len(media_info))
+            self._state_dirty = True
 
-            # If not playing and hasn't been updated recently, remove it
-            if not info.is_playing:
-                time_since_update = now - info.last_update
-                if time_since_update > stopped_timeout:
-                    logger.info(
-                        f"Removing stopped session (timeout): {session_id} - '{info.title}'"
+        return changed
+
+    async def _run_blocking(self, func: Callable, timeout: float):
+        """Run a blocking WinRT call on the shared worker pool with a timeout
+
+        A timed-out call keeps its worker until it returns (if ever). Once
+        MEDIA_WINRT_STUCK_LIMIT of them are outstanding, the pool is abandoned
+        for a fresh one so hung calls can't starve every later query.
+        """
+        from config import MEDIA_WINRT_STUCK_LIMIT, MEDIA_WINRT_WORKERS
+
+        if self._executor is None:
+            self._executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=MEDIA_WINRT_WORKERS, thread_name_prefix="media-winrt"
+            )
+            self._executor_stuck = 0
+        executor = self._executor
+        future = executor.submit(func)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+        except asyncio.TimeoutError:
+            if not future.done() and executor is self._executor:
+                self._executor_stuck += 1
+
+                def release(_):
+                    # Runs on the worker thread once the hung call finally returns
+                    self._call_in_loop(self._release_stuck_worker, executor)
+
+                future.add_done_callback(release)
+                if self._executor_stuck >= MEDIA_WINRT_STUCK_LIMIT:
+                    logger.warning(
+                        f"{self._executor_stuck} WinRT calls hung - replacing worker pool"
                     )
-                    del self._media_info[session_id]
-                    changed = True
+                    executor.shutdown(wait=False)
+                    self._executor = None
+            raise
 
-        if changed and self._on_state_change:
-            logger.debug(f"Broadcasting state change: {len(self._media_info)} sessions")
-            await self._on_state_change(self.get_state())
+    def _release_stuck_worker(self, executor: concurrent.futures.ThreadPoolExecutor) -> None:
+        """A timed-out call on executor returned; count it only if that pool is still in use"""
+        if executor is self._executor and self._executor_stuck > 0:
+            self._executor_stuck -= 1
 
     async def _get_media_info(
         self, session: "MediaSession", session_id: str
     ) -> DesktopMediaInfo:
-        """Get current media info from a session"""
+        """Get current media info from a session
+
+        _get_app_name uses the process cache; the caller refreshes it first.
+        """
         info = DesktopMediaInfo(
             session_id=session_id,
             app_id=self._get_app_name(session),
         )
+        playback_status = None
 
         try:
             # Get timeline (position/duration) - get this first to check if media ended
-            # Wrap in thread with timeout to prevent hanging
-            import concurrent.futures
-
+            # Run in a worker thread with timeout to prevent hanging
             def get_timeline():
                 try:
                     return session.get_timeline_properties()
                 except Exception:
                     return None
 
-            with concurrent.futures.ThreadPoolExecutor() as executor:
-                future = executor.submit(get_timeline)
-                try:
-                    timeline = future.result(timeout=0.5)
-                    if timeline:
-                        # Convert from TimeSpan (100-nanosecond units) to seconds
-                        info.current_time = (
-                            timeline.position.total_seconds() if timeline.position else 0
-                        )
-                        info.duration = (
-                            timeline.end_time.total_seconds() if timeline.end_time else 0
-                        )
-                except concurrent.futures.TimeoutError:
-                    logger.debug(f"Timeout getting timeline for {session_id}")
-                except Exception as e:
-                    logger.debug(f"Error getting timeline: {e}")
+            try:
+                timeline = await self._run_blocking(get_timeline, 0.5)
+                if timeline:
+                    # Convert from TimeSpan (100-nanosecond units) to seconds
+                    info.current_time = (
+                        timeline.position.total_seconds() if timeline.position else 0
+                    )
+                    info.duration = (
+                        timeline.end_time.total_seconds() if timeline.end_time else 0
+                    )
+            except asyncio.TimeoutError:
+                logger.debug("Timeout getting timeline for %s", session_id)
+            except Exception as e:
+                logger.debug("Error getting timeline: %s", e)
         except Exception as e:
-            logger.debug(f"Error in timeline thread: {e}")
+            logger.debug("Error in timeline thread: %s", e)
 
         try:
             # Get playback info - wrap in thread with timeout to prevent hanging
@@ -887,87 +1224,95 @@ class WindowsMediaManager:
                 except Exception:
                     return None
 
-            with concurrent.futures.ThreadPoolExecutor() as executor:
-                future = executor.submit(get_playback)
-                try:
-                    playback_info = future.result(timeout=0.5)
-                    if playback_info:
-                        status = playback_info.playback_status
-                        info.is_playing = status == PlaybackStatus.PLAYING
-
-                        # Detect manual pause: check if status is PAUSED
-                        # Windows Media Session API status values:
-                        # 0 = Playing, 1 = Paused, 2 = Stopped, 3 = Closed
-                        # If status is PAUSED (1), it's likely manually paused
-                        # If status is STOPPED (2) or CLOSED (3), it's likely ended/closed
+            try:
+                playback_info = await self._run_blocking(get_playback, 0.5)
+                if playback_info:
+                    status = playback_info.playback_status
+                    playback_status = status
+                    info.is_playing = status == PlaybackStatus.PLAYING
+
+                    # Detect manual pause: check if status is PAUSED
+                    # Windows Media Session API status values:
+                    # 0 = Playing, 1 = Paused, 2 = Stopped, 3 = Closed
+                    # If status is PAUSED (1), it's likely manually paused
+                    # If status is STOPPED (2) or CLOSED (3), it's likely ended/closed
+                    if PLAYBACK_PAUSED is not None:
+                        info.manually_paused = status == PLAYBACK_PAUSED
+                    else:
                         try:
-                            # Try to access PAUSED constant
-                            paused_status = getattr(PlaybackStatus, "PAUSED", None)
-                            if paused_status is None:
-                                # Fallback: check if status value is 1 (PAUSED)
-                                # Convert status to int and check
-                                status_value = (
-                                    int(status) if hasattr(status, "__int__") else status
-                                )
-                                info.manually_paused = status_value == 1  # 1 = PAUSED
-                            else:
-                                info.manually_paused = status == paused_status
+                            # Fallback: check if status value is 1 (PAUSED)
+                            # Convert status to int and check
+                            status_value = (
+                                int(status) if hasattr(status, "__int__") else status
+                            )
+                            info.manually_paused = status_value == 1  # 1 = PAUSED
                         except Exception:
                             # Fallback: assume not manually paused if we can't determine
                             info.manually_paused = False
 
-                        # Check if media has reached the end (even if status is still PLAYING)
-                        # Some apps don't update playback status immediately when media ends
-                        if info.duration > 0 and info.current_time > 0:
-                            # If we're at or past the end (with 2 second tolerance), mark as stopped
-                            if info.current_time >= (info.duration - 2.0):
-                                info.is_playing = False
-                                info.manually_paused = False  # Ended, not manually paused
-                                logger.debug(
-                                    f"Media ended: {info.title} ({info.current_time:.1f}/{info.duration:.1f})"
-                                )
+                    # Check if media has reached the end (even if status is still PLAYING)
+                    # Some apps don't update playback status immediately when media ends
+                    if info.duration > 0 and info.current_time > 0:
+                        # If we're at or past the end (with 2 second tolerance), mark as stopped
+                        if info.current_time >= (info.duration - 2.0):
+                            info.is_playing = False
+                            info.manually_paused = False  # Ended, not manually paused
+                            logger.debug(
+                                "Media ended: %s (%.1f/%.1f)",
+                                info.title,
+                                info.current_time,
+                                info.duration,
+                            )
 
-                        # Get playback rate if available
-                        if playback_info.playback_rate:
-                            info.playback_rate = playback_info.playback_rate
-                except concurrent.futures.TimeoutError:
-                    logger.debug(f"Timeout getting playback info for {session_id}")
-                except Exception as e:
-                    logger.debug(f"Error getting playback info: {e}")
+                    # Get playback rate if available
+                    if playback_info.playback_rate:
+                        info.playback_rate = playback_info.playback_rate
+            except asyncio.TimeoutError:
+                logger.debug("Timeout getting playback info for %s", session_id)
+            except Exception as e:
+                logger.debug("Error getting playback info: %s", e)
         except Exception as e:
-            logger.debug(f"Error getting playback info: {e}")
+            logger.debug("Error getting playback info: %s", e)
+
+        # Fetching metadata is the slow part (a WinRT round trip, up to 2s).
+        # Skip it while the status, duration and position (in 5s buckets) are
+        # unchanged and the session hasn't reported a metadata change.
+        fingerprint = None
+        if playback_status is not None:
+            fingerprint = (
+                playback_status,
+                int(info.duration),
+                int(info.current_time // 5),
+            )
+        old_info = self._media_info.get(session_id)
+        if (
+            fingerprint is not None
+            and old_info is not None
+            and old_info._fingerprint == fingerprint
+            and session_id not in self._props_changed
+        ):
+            info.title = old_info.title
+            info.artist = old_info.artist
+            info.album = old_info.album
+            info.cover_url = old_info.cover_url
+            info._fingerprint = fingerprint
+            return info
+        self._props_changed.discard(session_id)
 
         try:
             # Get media properties (title, artist, etc.)
-            # WinRT async can hang, so run in thread with timeout
-            def get_props():
-                try:
-                    import asyncio
-
-                    loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(loop)
-                    try:
-                        return loop.run_until_complete(
-                            asyncio.wait_for(
-                                session.try_get_media_properties_async(), 1.5
-                            )
-                        )
-                    finally:
-                        loop.close()
-                except Exception:
-                    return None
-
-            import concurrent.futures
-
-            with concurrent.futures.ThreadPoolExecutor() as executor:
-                future = executor.submit(get_props)
-                try:
-                    media_props = future.result(timeout=2.0)
-                except concurrent.futures.TimeoutError:
-                    logger.debug(
-                        f"Thread timeout getting media properties for {session_id}"
-                    )
-                    media_props = None
+            # WinRT async operations are awaitable on this loop directly; the
+            # timeout guards against the ones that never complete
+            try:
+                media_props = await asyncio.wait_for(
+                    session.try_get_media_properties_async(), 2.0
+                )
+            except asyncio.TimeoutError:
+                logger.debug(
+                    "Timeout getting media properties for %s",
+                    session_id,
+                )
+                media_props = None
 
             if media_props:
                 info.title = media_props.title or info.app_id
@@ -982,8 +1327,10 @@ class WindowsMediaManager:
                 # Thumbnail fetching can hang on some apps (like AyuGram)
                 info.cover_url = ""
 
+                info._fingerprint = fingerprint
+
         except Exception as e:
-            logger.debug(f"Error getting media properties: {e}")
+            logger.debug("Error getting media properties: %s", e)
 
         return info
 
@@ -1000,21 +1347,18 @@ class WindowsMediaManager:
             buffer = Buffer(size)
             await stream.read_async(buffer, size, InputStreamOptions.NONE)
 
-            # Get bytes from buffer
-            reader = DataReader.from_buffer(buffer)
-            bytes_data = bytearray(size)
-            for i in range(size):
-                bytes_data[i] = reader.read_byte()
-
-            # Convert to base64 data URL
+            # winrt Buffers support the buffer protocol, so base64 can read the
+            # image straight out of the WinRT buffer without copying it first
             import base64
 
-            b64 = base64.b64encode(bytes(bytes_data)).decode("ascii")
+            with memoryview(buffer) as view:
+                b64 = base64.b64encode(view).decode("ascii")
+                header = bytes(view[:8])
 
             # Detect image type from magic bytes
-            if bytes_data[:3] == b"\xff\xd8\xff":
+            if header.startswith(b"\xff\xd8\xff"):
                 mime = "image/jpeg"
-            elif bytes_data[:8] == b"\x89PNG\r\n\x1a\n":
+            elif header.startswith(b"\x89PNG\r\n\x1a\n"):
                 mime = "image/png"
             else:
                 mime = "image/jpeg"  # Default assumption
@@ -1022,65 +1366,87 @@ class WindowsMediaManager:
             return f"data:{mime};base64,{b64}"
 
         except Exception as e:
-            logger.debug(f"Error reading thumbnail: {e}")
+            logger.debug("Error reading thumbnail: %s", e)
             return ""
 
-    def get_state(self) -> Dict[str, Any]:
-        """Get current state of all desktop media (deduplicated)"""
+    def _collect_media(
+        self, media_info: Optional[Dict[str, DesktopMediaInfo]] = None
+    ) -> Tuple[Optional[DesktopMediaInfo], List[DesktopMediaInfo]]:
+        """Split deduplicated media into (active, paused) without building dicts"""
+        if media_info is None:
+            media_info = self._media_info
         active_media = None
         paused_list = []
-        seen_keys = set()  # For deduplication
-        seen_titles = set()  # For Spotify-specific deduplication by title
-        seen_media_ids = set()  # Also deduplicate by mediaId to catch exact duplicates
+        # mediaIds ("id", ...) and DesktopMediaInfo.dedup_key()s already listed
+        seen = set()
 
-        for session_id, info in self._media_info.items():
+        for session_id, info in media_info.items():
             # First check: if we've seen this exact mediaId, skip it
-            media_id = info.session_id
-            if media_id in seen_media_ids:
+            id_key = ("id", info.session_id)
+            if id_key in seen:
                 logger.debug(
-                    f"Skipping duplicate mediaId: {media_id} (session: {session_id})"
+                    "Skipping duplicate mediaId: %s (session: %s)",
+                    info.session_id,
+                    session_id,
                 )
                 continue
-            seen_media_ids.add(media_id)
-
-            # Second check: For Spotify, deduplicate by title only (app_id might differ between regular and fallback)
-            # For others, use app_id:title
-            if info.app_id.lower() == "spotify":
-                # Normalize title for comparison (strip whitespace, case-insensitive)
-                normalized_title = info.title.strip().lower() if info.title else ""
-                if normalized_title in seen_titles:
-                    logger.debug(
-                        f"Skipping duplicate Spotify: {info.title} (session: {session_id})"
-                    )
-                    continue
-                seen_titles.add(normalized_title)
-            else:
-                dedup_key = self._get_dedup_key(info)
-                if dedup_key in seen_keys:
-                    logger.debug(
-                        f"Skipping duplicate: {dedup_key} (session: {session_id})"
-                    )
-                    continue
-                seen_keys.add(dedup_key)
+            seen.add(id_key)
 
-            media_dict = info.to_dict()
+            # Second check: same media from another session
+            dedup_key = info.dedup_key()
+            if dedup_key in seen:
+                logger.debug(
+                    "Skipping duplicate: %s (session: %s)",
+                    dedup_key,
+                    session_id,
+                )
+                continue
+            seen.add(dedup_key)
 
             if info.is_playing:
                 # If we have an active and another is playing, add active to paused
                 if active_media:
                     paused_list.append(active_media)
-                active_media = media_dict
+                active_media = info
             else:
-                paused_list.append(media_dict)
+                paused_list.append(info)
+
+        return active_media, paused_list
+
+    def get_summary(self) -> Tuple[Optional[DesktopMediaInfo], int]:
+        """Get the active media and paused count (cheap - no dicts are built)"""
+        active_media, paused_list = self._collect_media()
+        return active_media, len(paused_list)
+
+    def get_state(self) -> Dict[str, Any]:
+        """Get current state of all desktop media (deduplicated)"""
+        # to_dict() hands back the same object until a session's fields change,
+        # so if every session still returns the dict it did last time (in the
+        # same order) the previous state is still accurate and can be reused
+        media_info = self._media_info  # one snapshot for the whole call
+        dicts = [info.to_dict() for info in media_info.values()]
+        cache = self._state_cache
+        if (
+            cache is not None
+            and len(cache[0]) == len(dicts)
+            and all(a is b for a, b in zip(cache[0], dicts))
+        ):
+            return cache[1]
+
+        active_media, paused_list = self._collect_media(media_info)
 
         logger.debug(
-            f"State: active={active_media.get('title') if active_media else None}, paused={len(paused_list)}"
+            "State: active=%s, paused=%d",
+            active_media.title if active_media else None,
+            len(paused_list),
         )
 
-        return {
-            "activeMedia": active_media,
-            "pausedList": paused_list,
+        state = {
+            "activeMedia": active_media.to_dict() if active_media else None,
+            "pausedList": [info.to_dict() for info in paused_list],
         }
+        self._state_cache = (dicts, state)
+        return state
 
     async def play(self, session_id: str) -> bool:
         """Play a specific session"""
@@ -1168,15 +1534,49 @@ class WindowsMediaManager:
             logger.error(f"Error going to previous {session_id}: {e}")
             return False
 
+    def _schedule_pause_all_except(self, session_id: str) -> None:
+        """Run pause_all_except in the background so polling doesn't wait on it"""
+        task = asyncio.create_task(self.pause_all_except(session_id))
+        self._pause_tasks.add(task)
+        task.add_done_callback(self._on_pause_all_except_done)
+
+    def _on_pause_all_except_done(self, task: asyncio.Task) -> None:
+        """Log the result of a background pause_all_except and publish the paused state"""
+        self._pause_tasks.discard(task)
+        if task.cancelled():
+            return
+        if task.exception() is not None:
+            logger.error(f"Error pausing other desktop media: {task.exception()}")
+        elif task.result() > 0:
+            logger.info(f"Paused {task.result()} other desktop media session(s)")
+            # The sessions were marked paused in place after this poll published
+            # its state, so the next poll sees no change - notify explicitly
+            self._state_dirty = True
+            self._wake_event.set()
+
     async def pause_all_except(self, except_session_id: Optional[str] = None) -> int:
         """Pause all playing sessions except the specified one"""
-        paused_count = 0
+        targets = [
+            (session_id, info)
+            for session_id, info in self._media_info.items()
+            if info.is_playing and session_id != except_session_id
+        ]
+        if not targets:
+            return 0
+
+        # Send the pauses concurrently - one round trip instead of one per session
+        results = await asyncio.gather(
+            *(self.pause(session_id) for session_id, _ in targets),
+            return_exceptions=True,
+        )
 
-        for session_id, info in self._media_info.items():
-            if info.is_playing and session_id != except_session_id:
-                if await self.pause(session_id):
-                    info.is_playing = False
-                    paused_count += 1
+        paused_count = 0
+        for (session_id, info), result in zip(targets, results):
+            if isinstance(result, Exception):
+                logger.error(f"Error pausing {session_id}: {result}")
+            elif result:
+                info.is_playing = False
+                paused_count += 1
 
         return paused_count
 
@@ -3,7 +3,7 @@
 
 import logging
 import threading
-from typing import Callable, Optional
+from typing import Callable, Dict, Optional, Tuple
 
 try:
     import pystray
@@ -16,6 +16,22 @@ except ImportError:
 logger = logging.getLogger(__name__)
 
 
+def _hex_to_rgb(hex_color: str) -> tuple:
+    """Convert hex color to RGB tuple"""
+    hex_color = hex_color.lstrip("#")
+    return tuple(int(hex_color[i : i + 2], 16) for i in (0, 2, 4))
+
+
+# Play triangle (pointing right) for the 64px icon - the same for every render
+_ICON_SIZE = 64
+_TRIANGLE_SIZE = 56  # Matching extension size
+_TRIANGLE_POINTS = (
+    (_ICON_SIZE // 2 - _TRIANGLE_SIZE // 3, _ICON_SIZE // 2 - _TRIANGLE_SIZE // 2),
+    (_ICON_SIZE // 2 - _TRIANGLE_SIZE // 3, _ICON_SIZE // 2 + _TRIANGLE_SIZE // 2),
+    (_ICON_SIZE // 2 + _TRIANGLE_SIZE * 2 // 3, _ICON_SIZE // 2),
+)
+
+
 # Extension icon colors (matching exactly)
 class Colors:
     # Extension active icon colors (pause bars when playing)
@@ -35,11 +51,16 @@ class Colors:
     RED = "#eb6f92"  # Not connected (red/pink)
     YELLOW = "#f6c177"  # Idle, no browser connected (yellow)
 
-    @staticmethod
-    def hex_to_rgb(hex_color: str) -> tuple:
-        """Convert hex color to RGB tuple"""
-        hex_color = hex_color.lstrip("#")
-        return tuple(int(hex_color[i : i + 2], 16) for i in (0, 2, 4))
+    # RGB tuples for drawing, parsed once at import
+    ACTIVE_STROKE_RGB = _hex_to_rgb(ACTIVE_STROKE)
+    ACTIVE_GRADIENT_START_RGB = _hex_to_rgb(ACTIVE_GRADIENT_START)
+    IDLE_STROKE_RGB = _hex_to_rgb(IDLE_STROKE)
+    IDLE_SYMBOL_RGB = _hex_to_rgb(IDLE_SYMBOL)
+    BG_DARK_RGB = _hex_to_rgb(BG_DARK)
+    BG_LIGHT_RGB = _hex_to_rgb(BG_LIGHT)
+    YELLOW_RGB = _hex_to_rgb(YELLOW)
+
+    hex_to_rgb = staticmethod(_hex_to_rgb)
 
 
 class TrayIcon:
@@ -53,6 +74,14 @@ class TrayIcon:
         self._has_any_media = False
         self._running = False
         self._thread: Optional[threading.Thread] = None
+        # (connected, has_media) -> rendered icon; there are only a few states
+        self._image_cache: Dict[Tuple[bool, bool], "Image"] = {}
+        # What the live icon currently shows, so unchanged updates are no-ops
+        self._shown_key: Optional[Tuple[bool, bool]] = None
+        self._shown_title: Optional[str] = None
+        # Menu text, formatted when the status changes rather than on every menu open
+        self._clients_label = "Clients: 0"
+        self._media_label = "Media: None"
 
     @property
     def is_available(self) -> bool:
@@ -62,7 +91,12 @@ class TrayIcon:
         self, connected: bool = False, has_media: bool = False
     ) -> "Image":
         """Create icon matching extension exactly - play/pause with proper colors"""
-        size = 64
+        key = (connected, has_media)
+        cached = self._image_cache.get(key)
+        if cached is not None:
+            return cached
+
+        size = _ICON_SIZE
         image = Image.new("RGBA", (size, size), (0, 0, 0, 0))
         draw = ImageDraw.Draw(image)
 
@@ -74,8 +108,8 @@ class TrayIcon:
             # Background circle with pink stroke
             draw.ellipse(
                 [center_x - radius, center_y - radius, center_x + radius, center_y + radius],
-                fill=Colors.hex_to_rgb(Colors.BG_LIGHT),
-                outline=Colors.hex_to_rgb(Colors.ACTIVE_STROKE),
+                fill=Colors.BG_LIGHT_RGB,
+                outline=Colors.ACTIVE_STROKE_RGB,
                 width=6,
             )
 
@@ -88,76 +122,40 @@ class TrayIcon:
             y = center_y - bar_height // 2
 
             # Create gradient effect (simplified - using solid color for now)
-            # Left bar (with rounded corners manually)
-            draw.rectangle(
-                [x1, y + 4, x1 + bar_width, y + bar_height - 4],
-                fill=Colors.hex_to_rgb(Colors.ACTIVE_GRADIENT_START),
-            )
-            # Rounded top
-            draw.ellipse([x1, y, x1 + 8, y + 8], fill=Colors.hex_to_rgb(Colors.ACTIVE_GRADIENT_START))
-            draw.ellipse([x1 + 6, y, x1 + bar_width, y + 8], fill=Colors.hex_to_rgb(Colors.ACTIVE_GRADIENT_START))
-            # Rounded bottom
-            draw.ellipse([x1, y + bar_height - 8, x1 + 8, y + bar_height], fill=Colors.hex_to_rgb(Colors.ACTIVE_GRADIENT_START))
-            draw.ellipse([x1 + 6, y + bar_height - 8, x1 + bar_width, y + bar_height], fill=Colors.hex_to_rgb(Colors.ACTIVE_GRADIENT_START))
-
-            # Right bar (with rounded corners manually)
-            draw.rectangle(
-                [x2, y + 4, x2 + bar_width, y + bar_height - 4],
-                fill=Colors.hex_to_rgb(Colors.ACTIVE_GRADIENT_START),
-            )
-            # Rounded top
-            draw.ellipse([x2, y, x2 + 8, y + 8], fill=Colors.hex_to_rgb(Colors.ACTIVE_GRADIENT_START))
-            draw.ellipse([x2 + 6, y, x2 + bar_width, y + 8], fill=Colors.hex_to_rgb(Colors.ACTIVE_GRADIENT_START))
-            # Rounded bottom
-            draw.ellipse([x2, y + bar_height - 8, x2 + 8, y + bar_height], fill=Colors.hex_to_rgb(Colors.ACTIVE_GRADIENT_START))
-            draw.ellipse([x2 + 6, y + bar_height - 8, x2 + bar_width, y + bar_height], fill=Colors.hex_to_rgb(Colors.ACTIVE_GRADIENT_START))
+            for bar_x in (x1, x2):
+                draw.rounded_rectangle(
+                    [bar_x, y, bar_x + bar_width, y + bar_height],
+                    radius=4,
+                    fill=Colors.ACTIVE_GRADIENT_START_RGB,
+                )
 
         elif connected:
             # CONNECTED, NO MEDIA: Play triangle, dimmed (matching icon-idle.svg)
             # Background circle with muted gray stroke
             draw.ellipse(
                 [center_x - radius, center_y - radius, center_x + radius, center_y + radius],
-                fill=Colors.hex_to_rgb(Colors.BG_DARK),
-                outline=Colors.hex_to_rgb(Colors.IDLE_STROKE),
+                fill=Colors.BG_DARK_RGB,
+                outline=Colors.IDLE_STROKE_RGB,
                 width=4,
             )
 
             # Draw play triangle (pointing right)
-            triangle_size = 56  # Matching extension size
-            x1 = center_x - triangle_size // 3
-            y1 = center_y - triangle_size // 2
-            x2 = center_x - triangle_size // 3
-            y2 = center_y + triangle_size // 2
-            x3 = center_x + triangle_size * 2 // 3
-            y3 = center_y
-            draw.polygon(
-                [(x1, y1), (x2, y2), (x3, y3)],
-                fill=Colors.hex_to_rgb(Colors.IDLE_SYMBOL),
-            )
+            draw.polygon(_TRIANGLE_POINTS, fill=Colors.IDLE_SYMBOL_RGB)
 
         else:
             # NOT CONNECTED, IDLE: Play triangle, yellow
             # Background circle with yellow stroke
             draw.ellipse(
                 [center_x - radius, center_y - radius, center_x + radius, center_y + radius],
-                fill=Colors.hex_to_rgb(Colors.BG_DARK),
-                outline=Colors.hex_to_rgb(Colors.YELLOW),
+                fill=Colors.BG_DARK_RGB,
+                outline=Colors.YELLOW_RGB,
                 width=4,
             )
 
             # Draw play triangle (pointing right) in yellow
-            triangle_size = 56
-            x1 = center_x - triangle_size // 3
-            y1 = center_y - triangle_size // 2
-            x2 = center_x - triangle_size // 3
-            y2 = center_y + triangle_size // 2
-            x3 = center_x + triangle_size * 2 // 3
-            y3 = center_y
-            draw.polygon(
-                [(x1, y1), (x2, y2), (x3, y3)],
-                fill=Colors.hex_to_rgb(Colors.YELLOW),
-            )
+            draw.polygon(_TRIANGLE_POINTS, fill=Colors.YELLOW_RGB)
 
+        self._image_cache[key] = image
         return image
 
     def _get_tooltip(self) -> str:
@@ -182,14 +180,8 @@ class TrayIcon:
         return pystray.Menu(
             pystray.MenuItem("Auto-Stop Media", None, enabled=False),
             pystray.Menu.SEPARATOR,
-            pystray.MenuItem(
-                lambda item: f"Clients: {self._connected_clients}", None, enabled=False
-            ),
-            pystray.MenuItem(
-                lambda item: f"Media: {'Playing' if self._active_media else 'None'}",
-                None,
-                enabled=False,
-            ),
+            pystray.MenuItem(lambda item: self._clients_label, None, enabled=False),
+            pystray.MenuItem(lambda item: self._media_label, None, enabled=False),
             pystray.Menu.SEPARATOR,
             pystray.MenuItem("Quit", self._on_quit_clicked),
         )
@@ -219,10 +211,13 @@ class TrayIcon:
     def _run(self):
         """Run the tray icon (blocking, runs in thread)"""
         try:
+            # Start from the latest status; updates before this point were skipped
+            self._shown_key = (self._connected_clients > 0, self._has_any_media)
+            self._shown_title = self._get_tooltip()
             self._icon = pystray.Icon(
                 name="AutoStopMedia",
-                icon=self._create_icon_image(False, False),
-                title=self._get_tooltip(),
+                icon=self._create_icon_image(*self._shown_key),
+                title=self._shown_title,
                 menu=self._create_menu(),
             )
             self._icon.run()
@@ -250,16 +245,35 @@ class TrayIcon:
         self._active_media = active_media
         self._has_any_media = has_any_media
 
-        if self._icon:
-            try:
-                # Update icon image
-                connected = connected_clients > 0
-                self._icon.icon = self._create_icon_image(connected, has_any_media)
-
-                # Update tooltip
-                self._icon.title = self._get_tooltip()
-            except Exception as e:
-                logger.debug(f"Failed to update tray icon: {e}")
+        clients_label = f"Clients: {connected_clients}"
+        media_label = f"Media: {'Playing' if active_media else 'None'}"
+        menu_changed = (clients_label, media_label) != (self._clients_label, self._media_label)
+        self._clients_label = clients_label
+        self._media_label = media_label
+
+        # Nothing to draw into while the icon is stopping or not yet created
+        icon = self._icon
+        if not self._running or icon is None:
+            return
+
+        try:
+            # Update icon image (each assignment is a native icon swap)
+            key = (connected_clients > 0, has_any_media)
+            if key != self._shown_key:
+                icon.icon = self._create_icon_image(*key)
+                self._shown_key = key
+
+            # Update tooltip
+            title = self._get_tooltip()
+            if title != self._shown_title:
+                icon.title = title
+                self._shown_title = title
+
+            # Refresh the menu so an open menu shows the new values
+            if menu_changed:
+                icon.update_menu()
+        except Exception as e:
+            logger.debug("Failed to update tray icon: %s", e)
 
 
 # Singleton instance
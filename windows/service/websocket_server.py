@@ -5,17 +5,31 @@ import asyncio
 import json
 import logging
 from dataclasses import dataclass
-from typing import Any, Callable, Dict, Optional, Set
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
 
 try:
     import websockets
+    from websockets.legacy.protocol import broadcast as ws_broadcast
     from websockets.server import WebSocketServerProtocol, serve
 
     WEBSOCKETS_AVAILABLE = True
 except ImportError:
     WEBSOCKETS_AVAILABLE = False
 
-from config import MSG, WEBSOCKET_HOST, WEBSOCKET_PORT
+# orjson is optional - several times faster than the json module when installed
+try:
+    import orjson
+
+    def json_dumps(obj: Any) -> str:
+        # orjson produces bytes; websockets sends str as a text frame
+        return orjson.dumps(obj).decode("utf-8")
+
+    json_loads = orjson.loads  # orjson.JSONDecodeError subclasses json's
+except ImportError:
+    json_dumps = json.dumps
+    json_loads = json.loads
+
+from config import MSG, WEBSOCKET_HOST, WEBSOCKET_PORT, WS_SLOW_CLIENT_BUFFER
 
 logger = logging.getLogger(__name__)
 
@@ -24,6 +38,9 @@ logger = logging.getLogger(__name__)
 class ConnectedClient:
     """Represents a connected WebSocket client"""
 
+    # No field defaults, so slots can be declared by hand (dataclass(slots=True) is 3.10+)
+    __slots__ = ("websocket", "client_id", "connected_at")
+
     websocket: "WebSocketServerProtocol"
     client_id: str
     connected_at: float
@@ -41,10 +58,26 @@ class WebSocketServer:
         # Flag to prevent auto-pause loop when browser controls desktop media
         self._control_in_progress = False
         self._control_cooldown_task: Optional[asyncio.Task] = None
+        # Close handshakes of evicted slow clients (kept so they aren't GC'd)
+        self._evict_tasks: Set[asyncio.Task] = set()
         # Track browser media state for tray icon
         self._browser_media_active = False
         # Callback to update tray icon when state changes
         self._on_tray_update: Optional[Callable] = None
+        # Last desktop state sent and its serialized DESKTOP_STATE_UPDATE message
+        self._last_state: Optional[Dict[str, Any]] = None
+        self._last_state_message: Optional[str] = None
+        # Message type -> handler coroutine(websocket, data)
+        self._handlers: Dict[str, Callable[..., Awaitable[None]]] = {
+            MSG.PING: self._handle_ping,
+            MSG.GET_DESKTOP_STATE: self._handle_get_desktop_state,
+            MSG.CONTROL: self._handle_control,
+            MSG.REGISTER_BROWSER: self._handle_register_browser,
+            MSG.BROWSER_STATE_SYNC: self._handle_browser_state_sync,
+            MSG.MEDIA_PLAY: self._handle_media_play,
+            MSG.MEDIA_PAUSE: self._handle_media_pause,
+            MSG.MEDIA_ENDED: self._handle_media_ended,
+        }
 
     @property
     def is_available(self) -> bool:
@@ -104,7 +137,12 @@ class WebSocketServer:
         """Stop the WebSocket server"""
         self._running = False
 
-        # Close all client connections
+        # Stop accepting connections first so the listening socket is released
+        # while the existing clients are being closed
+        if self._server:
+            self._server.close()
+
+        # Close all client connections (asyncio.TaskGroup would need 3.11)
         if self._clients:
             await asyncio.gather(
                 *[
@@ -115,9 +153,7 @@ class WebSocketServer:
             )
             self._clients.clear()
 
-        # Close the server
         if self._server:
-            self._server.close()
             await self._server.wait_closed()
             self._server = None
 
@@ -139,7 +175,7 @@ class WebSocketServer:
                 await self._handle_message(websocket, message)
 
         except websockets.exceptions.ConnectionClosed as e:
-            logger.debug(f"Client {client_id} disconnected: {e.code} {e.reason}")
+            logger.debug("Client %s disconnected: %s %s", client_id, e.code, e.reason)
         except Exception as e:
             logger.error(f"Error handling client {client_id}: {e}")
         finally:
@@ -151,140 +187,144 @@ class WebSocketServer:
     ):
         """Handle an incoming message from a client"""
         try:
-            message = json.loads(raw_message)
+            message = json_loads(raw_message)
             msg_type = message.get("type")
             data = message.get("data", {})
 
-            logger.debug(f"Received message: {msg_type}")
-
-            if msg_type == MSG.PING:
-                # Include global playing state in PONG
-                state = self._media_manager.get_state()
-                desktop_playing = state.get("activeMedia") is not None
-                global_playing = self._browser_media_active or desktop_playing
-                await self._send(
-                    websocket,
-                    {
-                        "type": MSG.PONG,
-                        "data": {"globalPlaying": global_playing},
-                    },
-                )
-                # Update tray icon when ping received (keeps it in sync)
-                if self._on_tray_update:
-                    self._on_tray_update()
-
-            elif msg_type == MSG.GET_DESKTOP_STATE:
-                await self._send_desktop_state(websocket)
-
-            elif msg_type == MSG.CONTROL:
-                # Control desktop media
-                logger.info(f"Received CONTROL message: {data}")
-                action = data.get("action")
-                media_id = data.get("mediaId")
-                logger.info(f"CONTROL: action={action}, media_id={media_id}")
-
-                if media_id and media_id.startswith("desktop-"):
-                    # Set control flag to prevent auto-pause loop
-                    self._control_in_progress = True
-                    logger.info(
-                        f"CONTROL: calling handle_control({action}, {media_id})"
-                    )
-
-                    success = await self._media_manager.handle_control(action, media_id)
-                    logger.info(
-                        f"Control {action} on {media_id}: {'success' if success else 'failed'}"
-                    )
-
-                    # Send updated state after control
-                    if success:
-                        await asyncio.sleep(0.2)  # Brief delay for state to update
-                        await self.broadcast_desktop_state()
-
-                    # Clear control flag after a cooldown
-                    await self._start_control_cooldown()
-                else:
-                    logger.warning(
-                        f"CONTROL: media_id doesn't start with 'desktop-': {media_id}"
-                    )
-
-            elif msg_type == MSG.REGISTER_BROWSER:
-                # Register which browser the extension is in
-                self._media_manager.register_browser(data)
-                logger.info(f"Browser registered: {data.get('browser', 'unknown')}")
-
-            elif msg_type == MSG.BROWSER_STATE_SYNC:
-                # Browser is syncing its current state
-                has_active = data.get("hasActiveMedia", False)
-                active_media = data.get("activeMedia")
-                # Check if media is actually playing (not just exists)
-                is_playing = False
-                if has_active and active_media:
-                    is_playing = active_media.get("isPlaying", True)  # Default to True if not specified
-
-                self._browser_media_active = is_playing
-                logger.debug(f"Browser state sync: hasActiveMedia={has_active}, isPlaying={is_playing}, setting _browser_media_active={is_playing}")
-                # Update tray icon immediately
-                if self._on_tray_update:
-                    self._on_tray_update()
-
-            elif msg_type == MSG.MEDIA_PLAY:
-                # Browser media started playing - pause desktop media
-                # BUT skip if browser just sent a control command (prevent loop)
-                if self._control_in_progress:
-                    logger.debug(
-                        "Ignoring MEDIA_PLAY during control cooldown (preventing loop)"
-                    )
-                    return
-
-                # Track browser media state for tray icon
-                self._browser_media_active = True
-
-                # Update browser media titles for filtering
-                title = data.get("title", "")
-                if title:
-                    self._media_manager.update_browser_media(title, True)
-
-                if self._on_browser_media_event:
-                    await self._on_browser_media_event("play", data)
-                # Pause all desktop media when browser starts playing
-                await self._media_manager.pause_all_except()
-                logger.info("Browser media started - paused desktop media")
-                await self.broadcast_desktop_state()
-                # Update tray icon immediately
-                if self._on_tray_update:
-                    self._on_tray_update()
-
-            elif msg_type == MSG.MEDIA_PAUSE:
-                # Browser media paused
-                self._browser_media_active = False
-                title = data.get("title", "")
-                if title:
-                    self._media_manager.update_browser_media(title, False)
-
-                if self._on_browser_media_event:
-                    await self._on_browser_media_event("pause", data)
-                # Update tray icon immediately
-                if self._on_tray_update:
-                    self._on_tray_update()
-
-            elif msg_type == MSG.MEDIA_ENDED:
-                # Browser media ended
-                self._browser_media_active = False
-                title = data.get("title", "")
-                if title:
-                    self._media_manager.update_browser_media(title, False)
-
-                if self._on_browser_media_event:
-                    await self._on_browser_media_event("ended", data)
-                # Update tray icon immediately
-                if self._on_tray_update:
-                    self._on_tray_update()
+            logger.debug("Received message: %s", msg_type)
+
+            handler = self._handlers.get(msg_type)
+            if handler:
+                await handler(websocket, data)
 
         except json.JSONDecodeError:
             logger.warning(f"Invalid JSON received: {raw_message[:100]}")
         except Exception as e:
             logger.error(f"Error handling message: {e}")
 
+    async def _handle_ping(self, websocket: WebSocketServerProtocol, data: Dict[str, Any]):
+        # Include global playing state in PONG
+        state = self._media_manager.get_state()
+        desktop_playing = state.get("activeMedia") is not None
+        global_playing = self._browser_media_active or desktop_playing
+        await self._send(
+            websocket,
+            {
+                "type": MSG.PONG,
+                "data": {"globalPlaying": global_playing},
+            },
+        )
+        # Update tray icon when ping received (keeps it in sync)
+        if self._on_tray_update:
+            self._on_tray_update()
+
+    async def _handle_get_desktop_state(
+        self, websocket: WebSocketServerProtocol, data: Dict[str, Any]
+    ):
+        await self._send_desktop_state(websocket)
+
+    async def _handle_control(self, websocket: WebSocketServerProtocol, data: Dict[str, Any]):
+        # Control desktop media
+        logger.info(f"Received CONTROL message: {data}")
+        action = data.get("action")
+        media_id = data.get("mediaId")
+        logger.info(f"CONTROL: action={action}, media_id={media_id}")
+
+        if media_id and media_id.startswith("desktop-"):
+            # Set control flag to prevent auto-pause loop
+            self._control_in_progress = True
+            logger.info(f"CONTROL: calling handle_control({action}, {media_id})")
+
+            success = await self._media_manager.handle_control(action, media_id)
+            logger.info(
+                f"Control {action} on {media_id}: {'success' if success else 'failed'}"
+            )
+
+            # Send updated state after control
+            if success:
+                await asyncio.sleep(0.2)  # Brief delay for state to update
+                await self.broadcast_desktop_state()
+
+            # Clear control flag after a cooldown
+            await self._start_control_cooldown()
+        else:
+            logger.warning(f"CONTROL: media_id doesn't start with 'desktop-': {media_id}")
+
+    async def _handle_register_browser(
+        self, websocket: WebSocketServerProtocol, data: Dict[str, Any]
+    ):
+        # Register which browser the extension is in
+        self._media_manager.register_browser(data)
+        logger.info(f"Browser registered: {data.get('browser', 'unknown')}")
+
+    async def _handle_browser_state_sync(
+        self, websocket: WebSocketServerProtocol, data: Dict[str, Any]
+    ):
+        # Browser is syncing its current state
+        has_active = data.get("hasActiveMedia", False)
+        active_media = data.get("activeMedia")
+        # Check if media is actually playing (not just exists)
+        is_playing = False
+        if has_active and active_media:
+            is_playing = active_media.get("isPlaying", True)  # Default to True if not specified
+
+        self._browser_media_active = is_playing
+        logger.debug(
+            "Browser state sync: hasActiveMedia=%s, isPlaying=%s, setting _browser_media_active=%s",
+            has_active,
+            is_playing,
+            is_playing,
+        )
+        # Update tray icon immediately
+        if self._on_tray_update:
+            self._on_tray_update()
+
+    async def _handle_media_play(self, websocket: WebSocketServerProtocol, data: Dict[str, Any]):
+        # Browser media started playing - pause desktop media
+        # BUT skip if browser just sent a control command (prevent loop)
+        if self._control_in_progress:
+            logger.debug("Ignoring MEDIA_PLAY during control cooldown (preventing loop)")
+            return
+
+        # Track browser media state for tray icon
+        self._browser_media_active = True
+
+        # Update browser media titles for filtering
+        title = data.get("title", "")
+        if title:
+            self._media_manager.update_browser_media(title, True)
+
+        if self._on_browser_media_event:
+            await self._on_browser_media_event("play", data)
+        # Pause all desktop media when browser starts playing
+        await self._media_manager.pause_all_except()
+        logger.info("Browser media started - paused desktop media")
+        await self.broadcast_desktop_state()
+        # Update tray icon immediately
+        if self._on_tray_update:
+            self._on_tray_update()
+
+    async def _handle_media_pause(self, websocket: WebSocketServerProtocol, data: Dict[str, Any]):
+        # Browser media paused
+        await self._browser_media_stopped("pause", data)
+
+    async def _handle_media_ended(self, websocket: WebSocketServerProtocol, data: Dict[str, Any]):
+        # Browser media ended
+        await self._browser_media_stopped("ended", data)
+
+    async def _browser_media_stopped(self, event: str, data: Dict[str, Any]):
+        """Shared handling for browser media that paused or ended"""
+        self._browser_media_active = False
+        title = data.get("title", "")
+        if title:
+            self._media_manager.update_browser_media(title, False)
+
+        if self._on_browser_media_event:
+            await self._on_browser_media_event(event, data)
+        # Update tray icon immediately
+        if self._on_tray_update:
+            self._on_tray_update()
+
     async def _start_control_cooldown(self):
         """Start a cooldown period after control command to prevent loops"""
         # Cancel existing cooldown if any
@@ -301,35 +341,57 @@ class WebSocketServer:
     async def _send(self, websocket: WebSocketServerProtocol, message: Dict[str, Any]):
         """Send a message to a specific client"""
         try:
-            await websocket.send(json.dumps(message))
+            await websocket.send(json_dumps(message))
         except Exception as e:
-            logger.debug(f"Failed to send to client: {e}")
+            logger.debug("Failed to send to client: %s", e)
+
+    def _desktop_state_message(self, state: Optional[Dict[str, Any]] = None) -> str:
+        """Serialize a DESKTOP_STATE_UPDATE message (reused while state is unchanged)"""
+        if state is None:
+            state = self._media_manager.get_state()
+        # get_state() returns the same dict object until something changes
+        if state is not self._last_state:
+            self._last_state_message = json_dumps(
+                {"type": MSG.DESKTOP_STATE_UPDATE, "data": state}
+            )
+            self._last_state = state
+        return self._last_state_message
 
     async def _send_desktop_state(self, websocket: WebSocketServerProtocol):
         """Send current desktop media state to a client"""
-        state = self._media_manager.get_state()
-        await self._send(websocket, {"type": MSG.DESKTOP_STATE_UPDATE, "data": state})
+        try:
+            await websocket.send(self._desktop_state_message())
+        except Exception as e:
+            logger.debug("Failed to send to client: %s", e)
 
-    async def broadcast_desktop_state(self):
+    async def broadcast_desktop_state(self, state: Optional[Dict[str, Any]] = None):
         """Broadcast desktop media state to all connected clients"""
         if not self._clients:
             return
 
-        state = self._media_manager.get_state()
-        message = json.dumps({"type": MSG.DESKTOP_STATE_UPDATE, "data": state})
-
-        # Send to all clients
-        await asyncio.gather(
-            *[client.send(message) for client in self._clients], return_exceptions=True
-        )
+        self._broadcast(self._desktop_state_message(state))
 
     async def broadcast(self, message: Dict[str, Any]):
         """Broadcast a message to all connected clients"""
         if not self._clients:
             return
 
-        raw_message = json.dumps(message)
-        await asyncio.gather(
-            *[client.send(raw_message) for client in self._clients],
-            return_exceptions=True,
-        )
+        self._broadcast(json_dumps(message))
+
+    def _broadcast(self, message: str):
+        """Write a message to every client without waiting on any of them"""
+        # The frame is encoded once and written to each connection without a
+        # coroutine per client
+        ws_broadcast(self._clients, message)
+
+        # broadcast() has no backpressure - drop clients that stopped reading
+        # instead of letting their backlog grow until the ping timeout
+        for client in list(self._clients):
+            transport = client.transport
+            if transport is None or transport.get_write_buffer_size() <= WS_SLOW_CLIENT_BUFFER:
+                continue
+            logger.warning(f"Dropping slow client: {client.remote_address}")
+            self._clients.discard(client)
+            task = asyncio.create_task(client.close(1011, "Client too slow"))
+            self._evict_tasks.add(task)
+            task.add_done_callback(self._evict_tasks.discard)
@@ -4,50 +4,94 @@ import ctypes
 import time
 from ctypes import wintypes
 
-import psutil
-
 user32 = ctypes.windll.user32
+kernel32 = ctypes.windll.kernel32
 
 APPCOMMAND_MEDIA_PLAY_PAUSE = 14
 WM_APPCOMMAND = 0x0319
+TH32CS_SNAPPROCESS = 0x00000002
+INVALID_HANDLE_VALUE = wintypes.HANDLE(-1).value
+
+# Titles Spotify's windows show when no track info is available
+SPOTIFY_GENERIC_TITLES = frozenset({"", "Spotify", "Spotify Free", "Spotify Premium"})
+
+
+class PROCESSENTRY32W(ctypes.Structure):
+    _fields_ = [
+        ("dwSize", wintypes.DWORD),
+        ("cntUsage", wintypes.DWORD),
+        ("th32ProcessID", wintypes.DWORD),
+        ("th32DefaultHeapID", ctypes.c_size_t),
+        ("th32ModuleID", wintypes.DWORD),
+        ("cntThreads", wintypes.DWORD),
+        ("th32ParentProcessID", wintypes.DWORD),
+        ("pcPriClassBase", ctypes.c_long),
+        ("dwFlags", wintypes.DWORD),
+        ("szExeFile", wintypes.WCHAR * 260),
+    ]
+
+
+# Handles are pointer-sized - declare the signatures so they aren't truncated
+kernel32.CreateToolhelp32Snapshot.argtypes = [wintypes.DWORD, wintypes.DWORD]
+kernel32.CreateToolhelp32Snapshot.restype = wintypes.HANDLE
+kernel32.Process32FirstW.argtypes = [wintypes.HANDLE, ctypes.POINTER(PROCESSENTRY32W)]
+kernel32.Process32FirstW.restype = wintypes.BOOL
+kernel32.Process32NextW.argtypes = [wintypes.HANDLE, ctypes.POINTER(PROCESSENTRY32W)]
+kernel32.Process32NextW.restype = wintypes.BOOL
+kernel32.CloseHandle.argtypes = [wintypes.HANDLE]
+
+# Created once - EnumWindows only needs it to stay alive during the call
+WNDENUMPROC = ctypes.WINFUNCTYPE(ctypes.c_bool, wintypes.HWND, wintypes.LPARAM)
+
+
+def get_spotify_pids():
+    """Collect the PIDs of every process whose .exe name contains "spotify" (one snapshot walk)"""
+    pids = set()
+    snapshot = kernel32.CreateToolhelp32Snapshot(TH32CS_SNAPPROCESS, 0)
+    if snapshot == INVALID_HANDLE_VALUE:
+        return pids
+    try:
+        entry = PROCESSENTRY32W()
+        entry.dwSize = ctypes.sizeof(PROCESSENTRY32W)
+        ok = kernel32.Process32FirstW(snapshot, ctypes.byref(entry))
+        while ok:
+            if "spotify" in entry.szExeFile.lower():
+                pids.add(entry.th32ProcessID)
+            ok = kernel32.Process32NextW(snapshot, ctypes.byref(entry))
+    finally:
+        kernel32.CloseHandle(snapshot)
+    return pids
 
 
 def find_spotify_main_window():
     """Find Spotify's main window (the one with track title)"""
     result = {"hwnd": None, "title": None}
+    spotify_pids = get_spotify_pids()
+    if not spotify_pids:
+        return None, None
+
+    # Reused for every window instead of allocating per callback
+    title_buf = ctypes.create_unicode_buffer(512)
+    pid = wintypes.DWORD()
 
     def callback(hwnd, lParam):
-        # Get process ID
-        pid = ctypes.c_ulong()
+        # Rule out other processes' windows with a set lookup before any string work
         user32.GetWindowThreadProcessId(hwnd, ctypes.byref(pid))
+        if pid.value not in spotify_pids:
+            return True
 
-        try:
-            proc = psutil.Process(pid.value)
-            if "spotify" not in proc.name().lower():
-                return True
-        except Exception:
+        if not user32.GetWindowTextW(hwnd, title_buf, len(title_buf)):
             return True
+        title = title_buf.value
+
+        # The main window has "Artist - Track" format
+        if " - " not in title or title in SPOTIFY_GENERIC_TITLES:
+            return True
+
+        result["hwnd"] = hwnd
+        result["title"] = title
+        return False  # Stop enumeration
 
-        # Get title
-        length = user32.GetWindowTextLengthW(hwnd)
-        if length > 0:
-            buff = ctypes.create_unicode_buffer(length + 1)
-            user32.GetWindowTextW(hwnd, buff, length + 1)
-            title = buff.value
-
-            # The main window has "Artist - Track" format
-            if " - " in title and title not in [
-                "Spotify",
-                "Spotify Free",
-                "Spotify Premium",
-            ]:
-                result["hwnd"] = hwnd
-                result["title"] = title
-                return False  # Stop enumeration
-
-        return True
-
-    WNDENUMPROC = ctypes.WINFUNCTYPE(ctypes.c_bool, wintypes.HWND, wintypes.LPARAM)
     user32.EnumWindows(WNDENUMPROC(callback), 0)
     return result["hwnd"], result["title"]
 
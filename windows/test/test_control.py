@@ -6,26 +6,62 @@ import json
 import websockets
 
 
+class TestClient:
+    """One connection to the service, reused for any number of controls"""
+
+    def __init__(self, uri: str = "ws://127.0.0.1:42089"):
+        self.uri = uri
+        self.websocket = None
+        self.initial_state = None
+
+    async def __aenter__(self):
+        self.websocket = await websockets.connect(self.uri)
+        # The service pushes the current desktop state as soon as we connect
+        self.initial_state = await self._next_state(timeout=2.0)
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.websocket.close()
+
+    async def _next_state(self, timeout: float):
+        """Wait for the next DESKTOP_STATE_UPDATE (None on timeout)"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return None
+            try:
+                raw = await asyncio.wait_for(self.websocket.recv(), timeout=remaining)
+            except asyncio.TimeoutError:
+                return None
+            message = json.loads(raw)
+            if message.get("type") == "DESKTOP_STATE_UPDATE":
+                return message
+
+    async def control(self, action: str, media_id: str, timeout: float = 2.0):
+        """Send a CONTROL message and wait for the state broadcast that follows it"""
+        message = {
+            "type": "CONTROL",
+            "data": {"action": action, "mediaId": media_id},
+        }
+
+        print(f"Sending: {json.dumps(message, indent=2)}")
+        await self.websocket.send(json.dumps(message))
+        return await self._next_state(timeout)
+
+
 async def test_control():
-    uri = "ws://127.0.0.1:42089"
     try:
-        async with websockets.connect(uri) as websocket:
+        async with TestClient() as client:
             print("Connected!")
-
-            # Send CONTROL message
-            message = {
-                "type": "CONTROL",
-                "data": {"action": "play", "mediaId": "desktop-spotify-fallback"},
-            }
-
-            print(f"Sending: {json.dumps(message, indent=2)}")
-            await websocket.send(json.dumps(message))
+            print(f"Initial state: {client.initial_state}")
 
             # Wait for response
-            try:
-                response = await asyncio.wait_for(websocket.recv(), timeout=2.0)
+            response = await client.control("play", "desktop-spotify-fallback")
+            if response is not None:
                 print(f"Response: {response}")
-            except asyncio.TimeoutError:
+            else:
                 print("No response (timeout)")
 
     except Exception as e:
@@ -2,8 +2,8 @@
 Test specific Spotify control methods (not global media keys)
 """
 
+import asyncio
 import ctypes
-import socket
 import time
 from ctypes import wintypes
 
@@ -20,6 +20,94 @@ print("-" * 40)
 
 user32 = ctypes.windll.user32
 
+WNDENUMPROC = ctypes.WINFUNCTYPE(ctypes.c_bool, wintypes.HWND, wintypes.LPARAM)
+# Declare prototypes so ctypes doesn't guess (and truncate handles) on every call
+user32.EnumWindows.argtypes = [WNDENUMPROC, wintypes.LPARAM]
+user32.EnumWindows.restype = wintypes.BOOL
+user32.GetClassNameW.argtypes = [wintypes.HWND, wintypes.LPWSTR, ctypes.c_int]
+user32.GetClassNameW.restype = ctypes.c_int
+user32.GetForegroundWindow.argtypes = []
+user32.GetForegroundWindow.restype = wintypes.HWND
+user32.GetWindowTextW.argtypes = [wintypes.HWND, wintypes.LPWSTR, ctypes.c_int]
+user32.GetWindowTextW.restype = ctypes.c_int
+user32.GetWindowThreadProcessId.argtypes = [wintypes.HWND, ctypes.POINTER(wintypes.DWORD)]
+user32.GetWindowThreadProcessId.restype = wintypes.DWORD
+user32.IsWindow.argtypes = [wintypes.HWND]
+user32.IsWindow.restype = wintypes.BOOL
+user32.PostMessageW.argtypes = [wintypes.HWND, wintypes.UINT, wintypes.WPARAM, wintypes.LPARAM]
+user32.PostMessageW.restype = wintypes.BOOL
+user32.SendMessageTimeoutW.argtypes = [
+    wintypes.HWND,
+    wintypes.UINT,
+    wintypes.WPARAM,
+    wintypes.LPARAM,
+    wintypes.UINT,
+    wintypes.UINT,
+    ctypes.POINTER(ctypes.c_size_t),  # PDWORD_PTR
+]
+user32.SendMessageTimeoutW.restype = wintypes.LPARAM  # LRESULT
+user32.SetForegroundWindow.argtypes = [wintypes.HWND]
+user32.SetForegroundWindow.restype = wintypes.BOOL
+user32.WaitForInputIdle.argtypes = [wintypes.HANDLE, wintypes.DWORD]
+user32.WaitForInputIdle.restype = wintypes.DWORD
+
+kernel32 = ctypes.windll.kernel32
+kernel32.OpenProcess.argtypes = [wintypes.DWORD, wintypes.BOOL, wintypes.DWORD]
+kernel32.OpenProcess.restype = wintypes.HANDLE
+kernel32.CloseHandle.argtypes = [wintypes.HANDLE]
+kernel32.CloseHandle.restype = wintypes.BOOL
+
+PROCESS_QUERY_INFORMATION = 0x0400
+SYNCHRONIZE = 0x00100000
+
+INPUT_KEYBOARD = 1
+KEYEVENTF_KEYUP = 0x0002
+
+
+class KEYBDINPUT(ctypes.Structure):
+    _fields_ = [
+        ("wVk", wintypes.WORD),
+        ("wScan", wintypes.WORD),
+        ("dwFlags", wintypes.DWORD),
+        ("time", wintypes.DWORD),
+        ("dwExtraInfo", ctypes.c_size_t),  # ULONG_PTR
+    ]
+
+
+class MOUSEINPUT(ctypes.Structure):
+    # Only here so INPUT has its full size (the largest union member)
+    _fields_ = [
+        ("dx", wintypes.LONG),
+        ("dy", wintypes.LONG),
+        ("mouseData", wintypes.DWORD),
+        ("dwFlags", wintypes.DWORD),
+        ("time", wintypes.DWORD),
+        ("dwExtraInfo", ctypes.c_size_t),  # ULONG_PTR
+    ]
+
+
+class INPUT(ctypes.Structure):
+    class _U(ctypes.Union):
+        _fields_ = [("mi", MOUSEINPUT), ("ki", KEYBDINPUT)]
+
+    _anonymous_ = ("u",)
+    _fields_ = [("type", wintypes.DWORD), ("u", _U)]
+
+
+user32.SendInput.argtypes = [wintypes.UINT, ctypes.POINTER(INPUT), ctypes.c_int]
+user32.SendInput.restype = wintypes.UINT
+
+
+def press_key(vk_code, flags=0):
+    """Send key down + key up in a single SendInput call"""
+    inputs = (INPUT * 2)()
+    for event, extra_flags in zip(inputs, (0, KEYEVENTF_KEYUP)):
+        event.type = INPUT_KEYBOARD
+        event.ki.wVk = vk_code
+        event.ki.dwFlags = flags | extra_flags
+    return user32.SendInput(len(inputs), inputs, ctypes.sizeof(INPUT))
+
+
 # App commands
 APPCOMMAND_MEDIA_PLAY_PAUSE = 14
 APPCOMMAND_MEDIA_STOP = 13
@@ -27,74 +115,131 @@ APPCOMMAND_MEDIA_NEXTTRACK = 11
 APPCOMMAND_MEDIA_PREVIOUSTRACK = 12
 
 WM_APPCOMMAND = 0x0319
+SMTO_ABORTIFHUNG = 0x0002
 
+# Titles Spotify's windows show when no track info is available
+SPOTIFY_GENERIC_TITLES = frozenset({"", "Spotify", "Spotify Free", "Spotify Premium"})
 
-def find_spotify_window():
-    """Find Spotify's main window handle"""
-    EnumWindows = user32.EnumWindows
-    EnumWindowsProc = ctypes.WINFUNCTYPE(ctypes.c_bool, wintypes.HWND, wintypes.LPARAM)
-    GetWindowTextW = user32.GetWindowTextW
-    GetWindowTextLengthW = user32.GetWindowTextLengthW
-    GetClassNameW = user32.GetClassNameW
-    GetWindowThreadProcessId = user32.GetWindowThreadProcessId
-
-    spotify_hwnd = None
-
-    def callback(hwnd, lParam):
-        nonlocal spotify_hwnd
-
-        # Get window class
-        class_buff = ctypes.create_unicode_buffer(256)
-        GetClassNameW(hwnd, class_buff, 256)
-        # class_name = class_buff.value
-
-        # Get window title
-        length = GetWindowTextLengthW(hwnd)
-        if length > 0:
-            buff = ctypes.create_unicode_buffer(length + 1)
-            GetWindowTextW(hwnd, buff, length + 1)
-            title = buff.value
-        else:
-            title = ""
-
-        # Get process ID
-        pid = ctypes.c_ulong()
-        GetWindowThreadProcessId(hwnd, ctypes.byref(pid))
-
-        # Check if it's Spotify
-        try:
-            import psutil
-
-            proc = psutil.Process(pid.value)
-            if "spotify" in proc.name().lower():
-                # Prefer the main window (has title with track info)
-                if title and title not in [
-                    "",
-                    "Spotify",
-                    "Spotify Free",
-                    "Spotify Premium",
-                ]:
-                    spotify_hwnd = hwnd
-                    print(
-                        f"  Found Spotify window: hwnd={hwnd}, title='{title[:50]}...'"
-                    )
-                    return False  # Stop
-                elif not spotify_hwnd and title:
-                    spotify_hwnd = hwnd
-        except Exception:
-            pass
+# Last main window found, reused while it still exists and belongs to the same process
+_spotify_window_cache = {"hwnd": None, "pid": None}
+
+
+def _cached_spotify_window():
+    """Return the cached Spotify window if it's still valid"""
+    hwnd = _spotify_window_cache["hwnd"]
+    if not hwnd or not user32.IsWindow(hwnd):
+        return None
+    pid = wintypes.DWORD()
+    user32.GetWindowThreadProcessId(hwnd, ctypes.byref(pid))
+    if pid.value != _spotify_window_cache["pid"]:
+        return None
+    return hwnd
+
+
+def find_spotify_pids():
+    """PIDs of all running Spotify processes (one process walk)"""
+    try:
+        import psutil
+    except ImportError:
+        return set()
+
+    return {
+        p.info["pid"]
+        for p in psutil.process_iter(["pid", "name"])
+        if p.info["name"] and "spotify" in p.info["name"].lower()
+    }
 
+
+class EnumState(ctypes.Structure):
+    """Search state handed to the EnumWindows callback through lParam"""
+
+    _fields_ = [
+        ("pids", ctypes.py_object),  # Spotify PIDs to accept
+        ("hwnd", wintypes.HWND),  # Best match so far
+        ("main", ctypes.c_bool),  # hwnd is the main window, not a fallback
+    ]
+
+
+# Reused by every callback invocation (EnumWindows calls back on this thread)
+_title_buf = ctypes.create_unicode_buffer(512)
+_class_buf = ctypes.create_unicode_buffer(256)
+
+
+def _enum_spotify_window(hwnd, lParam):
+    """EnumWindows callback - records the best Spotify window in the EnumState at lParam"""
+    state = ctypes.cast(lParam, ctypes.POINTER(EnumState)).contents
+
+    # Get process ID - other apps' windows are skipped with a set lookup
+    pid = wintypes.DWORD()
+    user32.GetWindowThreadProcessId(hwnd, ctypes.byref(pid))
+    if pid.value not in state.pids:
         return True
 
-    EnumWindows(EnumWindowsProc(callback), 0)
+    # Get window class
+    user32.GetClassNameW(hwnd, _class_buf, len(_class_buf))
+    # class_name = _class_buf.value
+
+    # Get window title (one call - longer titles are truncated, fine for "Artist - Track")
+    if user32.GetWindowTextW(hwnd, _title_buf, len(_title_buf)) > 0:
+        title = _title_buf.value
+    else:
+        title = ""
+
+    # Prefer the main window (has title with track info)
+    if title and title not in SPOTIFY_GENERIC_TITLES:
+        state.hwnd = hwnd
+        state.main = True
+        print(f"  Found Spotify window: hwnd={hwnd}, title='{title[:50]}...'")
+        return False  # Stop
+    elif not state.hwnd and title:
+        state.hwnd = hwnd
+
+    return True
+
+
+# Callback trampoline created once and reused by every search
+_enum_spotify_window_proc = WNDENUMPROC(_enum_spotify_window)
+
+
+def find_spotify_window(spotify_pids=None):
+    """Find Spotify's main window handle"""
+    cached = _cached_spotify_window()
+    if cached:
+        return cached
+
+    if spotify_pids is None:
+        spotify_pids = find_spotify_pids()
+    if not spotify_pids:
+        return None
+
+    state = EnumState(spotify_pids, None)
+    user32.EnumWindows(_enum_spotify_window_proc, ctypes.addressof(state))
+    spotify_hwnd = state.hwnd
+
+    # Only the main window is cached - a fallback must not hide it once it appears
+    if state.main:
+        pid = wintypes.DWORD()
+        user32.GetWindowThreadProcessId(spotify_hwnd, ctypes.byref(pid))
+        _spotify_window_cache["hwnd"] = spotify_hwnd
+        _spotify_window_cache["pid"] = pid.value
     return spotify_hwnd
 
 
 def send_app_command(hwnd, command):
-    """Send WM_APPCOMMAND to a window"""
+    """Post WM_APPCOMMAND to a window (returns once queued, not once handled)"""
+    lParam = command << 16
+    return user32.PostMessageW(hwnd, WM_APPCOMMAND, hwnd, lParam)
+
+
+def send_app_command_sync(hwnd, command, timeout_ms=1000):
+    """Send WM_APPCOMMAND and return Spotify's reply (0 = not handled or no reply in time)"""
     lParam = command << 16
-    result = user32.SendMessageW(hwnd, WM_APPCOMMAND, hwnd, lParam)
-    return result
+    result = ctypes.c_size_t()
+    if not user32.SendMessageTimeoutW(
+        hwnd, WM_APPCOMMAND, hwnd, lParam, SMTO_ABORTIFHUNG, timeout_ms, ctypes.byref(result)
+    ):
+        return 0
+    return result.value
 
 
 hwnd = find_spotify_window()
@@ -114,31 +259,63 @@ print("\n[METHOD 2] Spicetify Local Server")
 print("-" * 40)
 
 
-def check_port(port):
-    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-    sock.settimeout(0.5)
-    result = sock.connect_ex(("127.0.0.1", port))
-    sock.close()
-    return result == 0
+WEBNOWPLAYING_PORT = 8974
+
+# Ports that recently refused or timed out are not probed again for this long
+CLOSED_PORT_TTL = 30.0
+_closed_ports = {}  # port -> monotonic time of the failed probe
+
+
+async def check_port(port, http=False):
+    """None if the port is closed, else the start of the HTTP reply (b"" unless http)
+
+    With http set, a HEAD request goes over the same connection that proved
+    the port open, so there's no second connect to ask what's listening.
+    """
+    failed_at = _closed_ports.get(port)
+    if failed_at is not None and time.monotonic() - failed_at < CLOSED_PORT_TTL:
+        return None
+    try:
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection("127.0.0.1", port), timeout=0.5
+        )
+    except (OSError, asyncio.TimeoutError):
+        _closed_ports[port] = time.monotonic()
+        return None
+    _closed_ports.pop(port, None)
+    try:
+        if not http:
+            return b""
+        writer.write(b"HEAD / HTTP/1.0\r\n\r\n")
+        # "HTTP/1.x NNN" - just enough for the status code
+        return await asyncio.wait_for(reader.read(12), timeout=1.0)
+    except (OSError, asyncio.TimeoutError):
+        return b""
+    finally:
+        writer.close()
+
+
+async def check_ports(ports):
+    """Probe all ports at once - total wait is one timeout, not one per port"""
+    return await asyncio.gather(
+        *(check_port(port, http=port == WEBNOWPLAYING_PORT) for port in ports)
+    )
 
 
 # Common Spicetify extension ports
-ports_to_check = [8974, 8975, 5000, 9000, 8080, 4381, 4370]
+ports_to_check = [WEBNOWPLAYING_PORT, 8975, 5000, 9000, 8080, 4381, 4370]
 
 print("  Checking for local servers...")
-for port in ports_to_check:
-    if check_port(port):
+results = dict(zip(ports_to_check, asyncio.run(check_ports(ports_to_check))))
+for port, reply in results.items():
+    if reply is not None:
         print(f"  ✓ Port {port} is OPEN - might be Spicetify!")
 
-# Check for WebNowPlaying specifically
-try:
-    import urllib.request
-
-    req = urllib.request.Request("http://127.0.0.1:8974/", method="GET")
-    req.add_header("User-Agent", "AutoStopMedia")
-    response = urllib.request.urlopen(req, timeout=1)
-    print(f"  WebNowPlaying response: {response.status}")
-except Exception:
+# Check for WebNowPlaying specifically (answered by the probe above)
+reply = results[WEBNOWPLAYING_PORT]
+if reply and reply.startswith(b"HTTP/1.") and reply[9:12].isdigit():
+    print(f"  WebNowPlaying response: {int(reply[9:12])}")
+else:
     print("  WebNowPlaying not found or not responding")
 
 # ============================================================================
@@ -159,15 +336,26 @@ def send_space_to_spotify():
         print("  Spotify window not found")
         return False
 
-    # Focus Spotify
+    # Focus Spotify, then wait only as long as it needs to be ready for input
+    # (returns immediately if it's already idle) instead of a fixed sleep
     user32.SetForegroundWindow(spotify_hwnd)
-    time.sleep(0.05)
+    pid = wintypes.DWORD()
+    user32.GetWindowThreadProcessId(spotify_hwnd, ctypes.byref(pid))
+    hproc = kernel32.OpenProcess(PROCESS_QUERY_INFORMATION | SYNCHRONIZE, False, pid.value)
+    if hproc:
+        try:
+            user32.WaitForInputIdle(hproc, 50)
+        finally:
+            kernel32.CloseHandle(hproc)
+    else:
+        time.sleep(0.05)
 
     # Send space
     VK_SPACE = 0x20
-    user32.keybd_event(VK_SPACE, 0, 0, 0)  # Key down
-    user32.keybd_event(VK_SPACE, 0, 0x0002, 0)  # Key up
+    press_key(VK_SPACE)
 
+    # Key events are only queued - give Spotify a moment to take them
+    # before focus moves back, or the space may land in the other window
     time.sleep(0.05)
 
     # Restore focus
@@ -223,7 +411,8 @@ This exposes a WebSocket we can control!
 input("\nPress Enter to test WM_APPCOMMAND play/pause...")
 if hwnd:
     print("Sending PLAY/PAUSE command to Spotify...")
-    result = send_app_command(hwnd, APPCOMMAND_MEDIA_PLAY_PAUSE)
+    # Needs Spotify's reply, so wait for it (bounded) instead of just posting
+    result = send_app_command_sync(hwnd, APPCOMMAND_MEDIA_PLAY_PAUSE)
     print(f"Result: {result} (0 = not handled, other = handled)")
 else:
     print("No Spotify window found")
@@ -4,6 +4,17 @@ Test script to explore different ways to detect and control Spotify on Windows
 
 import asyncio
 import ctypes
+import functools
+from ctypes import wintypes
+
+
+@functools.cache
+def snapshot_procs():
+    """One psutil walk -> {pid: {"pid", "name", "status"}}, shared by every test below"""
+    import psutil
+
+    return {p.pid: p.info for p in psutil.process_iter(["pid", "name", "status"])}
+
 
 print("=" * 60)
 print("Spotify Detection Test")
@@ -22,23 +33,33 @@ try:
 
     async def test_media_session():
         manager = await MediaManager.request_async()
-        sessions = manager.get_sessions()
+        sessions = list(manager.get_sessions())
 
-        print(f"Sessions found: {len(list(sessions))}")
+        print(f"Sessions found: {len(sessions)}")
 
-        # Re-get sessions (iterator consumed)
-        sessions = manager.get_sessions()
-        for session in sessions:
-            app_id = session.source_app_user_model_id or "unknown"
+        # Only Spotify's properties are of interest - the app id alone rules
+        # out the other sessions without a properties round-trip
+        app_ids = [session.source_app_user_model_id or "unknown" for session in sessions]
+        spotify_indexes = [i for i, app_id in enumerate(app_ids) if "spotify" in app_id.lower()]
+
+        # Request their properties at once instead of one after another
+        all_props = await asyncio.gather(
+            *(sessions[i].try_get_media_properties_async() for i in spotify_indexes),
+            return_exceptions=True,
+        )
+        spotify_props = dict(zip(spotify_indexes, all_props))
+
+        for i, app_id in enumerate(app_ids):
             print(f"  - App ID: {app_id}")
 
-            try:
-                props = await session.try_get_media_properties_async()
-                if props:
-                    print(f"    Title: {props.title}")
-                    print(f"    Artist: {props.artist}")
-            except Exception as e:
-                print(f"    Error getting props: {e}")
+            if i not in spotify_props:
+                continue
+            props = spotify_props[i]
+            if isinstance(props, Exception):
+                print(f"    Error getting props: {props}")
+            elif props:
+                print(f"    Title: {props.title}")
+                print(f"    Artist: {props.artist}")
 
         current = manager.get_current_session()
         if current:
@@ -58,21 +79,29 @@ print("\n[TEST 2] pycaw - Audio Sessions")
 print("-" * 40)
 
 try:
-    from pycaw.pycaw import AudioUtilities, ISimpleAudioVolume
+    from pycaw.pycaw import AudioUtilities
 
     sessions = AudioUtilities.GetAllSessions()
     print(f"Audio sessions found: {len(sessions)}")
 
+    # Names come from the shared process snapshot instead of a psutil.Process per session
+    procs = snapshot_procs()
     for session in sessions:
-        if session.Process:
-            volume = session._ctl.QueryInterface(ISimpleAudioVolume)
-            mute = volume.GetMute()
-            vol = volume.GetMasterVolume()
-            print(f"  - {session.Process.name()} (PID: {session.Process.pid})")
-            print(f"    Volume: {vol:.0%}, Muted: {mute}")
-
-            if "spotify" in session.Process.name().lower():
-                print("    *** SPOTIFY DETECTED! ***")
+        pid = session.ProcessId
+        info = procs.get(pid) if pid else None  # PID 0 is the system sounds session
+        if not info:
+            continue
+        name = info["name"] or ""
+        print(f"  - {name} (PID: {pid})")
+
+        # Only Spotify's volume is of interest - skip the COM calls for everyone else
+        if "spotify" not in name.lower():
+            continue
+        volume = session.SimpleAudioVolume
+        mute = volume.GetMute()
+        vol = volume.GetMasterVolume()
+        print(f"    Volume: {vol:.0%}, Muted: {mute}")
+        print("    *** SPOTIFY DETECTED! ***")
 
 except ImportError:
     print("pycaw not installed. Run: pip install pycaw")
@@ -86,12 +115,11 @@ print("\n[TEST 3] Process Detection")
 print("-" * 40)
 
 try:
-    import psutil
-
-    spotify_procs = []
-    for proc in psutil.process_iter(["pid", "name", "status"]):
-        if "spotify" in proc.info["name"].lower():
-            spotify_procs.append(proc.info)
+    spotify_procs = [
+        info
+        for info in snapshot_procs().values()
+        if info["name"] and "spotify" in info["name"].lower()
+    ]
 
     print(f"Spotify processes: {len(spotify_procs)}")
     for p in spotify_procs:
@@ -116,15 +144,52 @@ try:
 
     user32 = ctypes.windll.user32
 
+    INPUT_KEYBOARD = 1
+    KEYEVENTF_EXTENDEDKEY = 0x0001
+    KEYEVENTF_KEYUP = 0x0002
+
+    class KEYBDINPUT(ctypes.Structure):
+        _fields_ = [
+            ("wVk", wintypes.WORD),
+            ("wScan", wintypes.WORD),
+            ("dwFlags", wintypes.DWORD),
+            ("time", wintypes.DWORD),
+            ("dwExtraInfo", ctypes.c_size_t),  # ULONG_PTR
+        ]
+
+    class MOUSEINPUT(ctypes.Structure):
+        # Only here so INPUT has its full size (the largest union member)
+        _fields_ = [
+            ("dx", wintypes.LONG),
+            ("dy", wintypes.LONG),
+            ("mouseData", wintypes.DWORD),
+            ("dwFlags", wintypes.DWORD),
+            ("time", wintypes.DWORD),
+            ("dwExtraInfo", ctypes.c_size_t),  # ULONG_PTR
+        ]
+
+    class INPUT(ctypes.Structure):
+        class _U(ctypes.Union):
+            _fields_ = [("mi", MOUSEINPUT), ("ki", KEYBDINPUT)]
+
+        _anonymous_ = ("u",)
+        _fields_ = [("type", wintypes.DWORD), ("u", _U)]
+
+    user32.SendInput.argtypes = [wintypes.UINT, ctypes.POINTER(INPUT), ctypes.c_int]
+    user32.SendInput.restype = wintypes.UINT
+
+    def press_key(vk_code, flags=0):
+        """Send key down + key up in a single SendInput call"""
+        inputs = (INPUT * 2)()
+        for event, extra_flags in zip(inputs, (0, KEYEVENTF_KEYUP)):
+            event.type = INPUT_KEYBOARD
+            event.ki.wVk = vk_code
+            event.ki.dwFlags = flags | extra_flags
+        return user32.SendInput(len(inputs), inputs, ctypes.sizeof(INPUT))
+
     def press_media_key(vk_code):
         """Simulate a media key press"""
-        KEYEVENTF_EXTENDEDKEY = 0x0001
-        KEYEVENTF_KEYUP = 0x0002
-
-        # Key down
-        user32.keybd_event(vk_code, 0, KEYEVENTF_EXTENDEDKEY, 0)
-        # Key up
-        user32.keybd_event(vk_code, 0, KEYEVENTF_EXTENDEDKEY | KEYEVENTF_KEYUP, 0)
+        press_key(vk_code, KEYEVENTF_EXTENDEDKEY)
 
     print("Media key simulation available!")
     print("  - press_media_key(VK_MEDIA_PLAY_PAUSE) to toggle play/pause")
@@ -150,37 +215,48 @@ print("-" * 40)
 try:
     user32 = ctypes.windll.user32
 
+    EnumWindowsProc = ctypes.WINFUNCTYPE(ctypes.c_bool, wintypes.HWND, wintypes.LPARAM)
+    # Declare prototypes so ctypes doesn't guess (and truncate handles) on every call
+    user32.EnumWindows.argtypes = [EnumWindowsProc, wintypes.LPARAM]
+    user32.EnumWindows.restype = wintypes.BOOL
+    user32.GetClassNameW.argtypes = [wintypes.HWND, wintypes.LPWSTR, ctypes.c_int]
+    user32.GetClassNameW.restype = ctypes.c_int
+    user32.GetWindowTextW.argtypes = [wintypes.HWND, wintypes.LPWSTR, ctypes.c_int]
+    user32.GetWindowTextW.restype = ctypes.c_int
+    user32.IsWindowVisible.argtypes = [wintypes.HWND]
+    user32.IsWindowVisible.restype = wintypes.BOOL
+
+    # Reused by every callback invocation (EnumWindows calls back on this thread)
+    title_buf = ctypes.create_unicode_buffer(512)
+    class_buf = ctypes.create_unicode_buffer(256)
+
+    def foreach_window(hwnd, lParam):
+        """Collect Spotify windows into the list referenced by lParam"""
+        titles = ctypes.cast(lParam, ctypes.POINTER(ctypes.py_object)).contents.value
+        if user32.IsWindowVisible(hwnd):
+            # One call - longer titles are truncated, fine for "Artist - Track"
+            if user32.GetWindowTextW(hwnd, title_buf, len(title_buf)) > 0:
+                title = title_buf.value
+
+                # Get class name
+                user32.GetClassNameW(hwnd, class_buf, len(class_buf))
+                class_name = class_buf.value
+
+                if "spotify" in title.lower() or "spotify" in class_name.lower():
+                    titles.append((title, class_name))
+                    # A track title ("Artist - Track") is what we're after
+                    if " - " in title:
+                        return False  # Stop enumeration
+        return True
+
+    # Callback trampoline created once, not per search
+    foreach_window_proc = EnumWindowsProc(foreach_window)
+
     def get_spotify_window_title():
         """Find Spotify window and get its title (contains current track)"""
-        EnumWindows = user32.EnumWindows
-        EnumWindowsProc = ctypes.WINFUNCTYPE(
-            ctypes.c_bool, ctypes.POINTER(ctypes.c_int), ctypes.POINTER(ctypes.c_int)
-        )
-        GetWindowTextW = user32.GetWindowTextW
-        GetWindowTextLengthW = user32.GetWindowTextLengthW
-        IsWindowVisible = user32.IsWindowVisible
-        GetClassNameW = user32.GetClassNameW
-
         titles = []
-
-        def foreach_window(hwnd, lParam):
-            if IsWindowVisible(hwnd):
-                length = GetWindowTextLengthW(hwnd)
-                if length > 0:
-                    buff = ctypes.create_unicode_buffer(length + 1)
-                    GetWindowTextW(hwnd, buff, length + 1)
-                    title = buff.value
-
-                    # Get class name
-                    class_buff = ctypes.create_unicode_buffer(256)
-                    GetClassNameW(hwnd, class_buff, 256)
-                    class_name = class_buff.value
-
-                    if "spotify" in title.lower() or "spotify" in class_name.lower():
-                        titles.append((title, class_name))
-            return True
-
-        EnumWindows(EnumWindowsProc(foreach_window), 0)
+        titles_ref = ctypes.py_object(titles)
+        user32.EnumWindows(foreach_window_proc, ctypes.addressof(titles_ref))
         return titles
 
     spotify_windows = get_spotify_window_title()
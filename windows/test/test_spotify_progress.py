@@ -1,5 +1,6 @@
 """Test getting progress from Spotify"""
 
+import asyncio
 import ctypes
 from ctypes import wintypes
 
@@ -7,42 +8,77 @@ import psutil
 
 user32 = ctypes.windll.user32
 
+# Titles Spotify's windows show when no track info is available
+SPOTIFY_GENERIC_TITLES = frozenset({"", "Spotify", "Spotify Free", "Spotify Premium"})
+
+WNDENUMPROC = ctypes.WINFUNCTYPE(ctypes.c_bool, wintypes.HWND, wintypes.LPARAM)
+# Declare prototypes so ctypes doesn't guess (and truncate handles) on every call
+user32.EnumWindows.argtypes = [WNDENUMPROC, wintypes.LPARAM]
+user32.EnumWindows.restype = wintypes.BOOL
+user32.GetWindowTextW.argtypes = [wintypes.HWND, wintypes.LPWSTR, ctypes.c_int]
+user32.GetWindowTextW.restype = ctypes.c_int
+user32.GetWindowThreadProcessId.argtypes = [wintypes.HWND, ctypes.POINTER(wintypes.DWORD)]
+user32.GetWindowThreadProcessId.restype = wintypes.DWORD
+
+
+def find_spotify_pids():
+    """PIDs of all running Spotify processes (one process walk)"""
+    return {
+        p.info["pid"]
+        for p in psutil.process_iter(["pid", "name"])
+        if p.info["name"] and "spotify" in p.info["name"].lower()
+    }
+
+
+class EnumState(ctypes.Structure):
+    """Search state handed to the EnumWindows callback through lParam"""
+
+    _fields_ = [
+        ("pids", ctypes.py_object),  # Spotify PIDs to accept
+        ("hwnd", wintypes.HWND),  # Main window, once found
+    ]
+
+
+# Reused for every window; holds the match's title once enumeration stops.
+# (An array field of the Structure would read back as a fresh str, not a buffer.)
+_title_buf = ctypes.create_unicode_buffer(512)
 
-def find_spotify_window():
-    """Find Spotify's main window"""
-    result = {"hwnd": None, "title": None}
-
-    def callback(hwnd, lParam):
-        pid = ctypes.c_ulong()
-        user32.GetWindowThreadProcessId(hwnd, ctypes.byref(pid))
-
-        try:
-            proc = psutil.Process(pid.value)
-            if "spotify" not in proc.name().lower():
-                return True
-        except Exception:
-            return True
-
-        length = user32.GetWindowTextLengthW(hwnd)
-        if length > 0:
-            buff = ctypes.create_unicode_buffer(length + 1)
-            user32.GetWindowTextW(hwnd, buff, length + 1)
-            title = buff.value
-
-            if " - " in title and title not in [
-                "Spotify",
-                "Spotify Free",
-                "Spotify Premium",
-            ]:
-                result["hwnd"] = hwnd
-                result["title"] = title
-                return False
 
+def _enum_spotify_window(hwnd, lParam):
+    """EnumWindows callback - records Spotify's main window in the EnumState at lParam"""
+    state = ctypes.cast(lParam, ctypes.POINTER(EnumState)).contents
+
+    pid = wintypes.DWORD()
+    user32.GetWindowThreadProcessId(hwnd, ctypes.byref(pid))
+    if pid.value not in state.pids:
         return True
 
-    WNDENUMPROC = ctypes.WINFUNCTYPE(ctypes.c_bool, wintypes.HWND, wintypes.LPARAM)
-    user32.EnumWindows(WNDENUMPROC(callback), 0)
-    return result["hwnd"], result["title"]
+    if user32.GetWindowTextW(hwnd, _title_buf, len(_title_buf)) > 0:
+        title = _title_buf.value
+
+        if " - " in title and title not in SPOTIFY_GENERIC_TITLES:
+            state.hwnd = hwnd
+            return False
+
+    return True
+
+
+# Callback trampoline created once and reused by every search
+_enum_spotify_window_proc = WNDENUMPROC(_enum_spotify_window)
+
+
+def find_spotify_window(spotify_pids=None):
+    """Find Spotify's main window"""
+    if spotify_pids is None:
+        spotify_pids = find_spotify_pids()
+    if not spotify_pids:
+        return None, None
+
+    state = EnumState(spotify_pids, None)
+    user32.EnumWindows(_enum_spotify_window_proc, ctypes.addressof(state))
+    if not state.hwnd:
+        return None, None
+    return state.hwnd, _title_buf.value
 
 
 print("Finding Spotify window...")
@@ -60,32 +96,36 @@ if hwnd:
             GlobalSystemMediaTransportControlsSessionManager as MediaManager,
         )
 
-        manager = MediaManager.request_async().get_results()
-        sessions = manager.get_sessions()
-
-        print(f"Found {len(sessions)} media sessions")
-        for i, session in enumerate(sessions):
-            app_id = session.source_app_user_model_id or ""
-            print(f"  Session {i}: {app_id}")
-
-            if "spotify" in app_id.lower():
-                print("  ✓ Spotify found in Media Session API!")
-                try:
-                    timeline = session.get_timeline_properties()
-                    if timeline:
-                        pos = (
-                            timeline.position.total_seconds()
-                            if timeline.position
-                            else 0
-                        )
-                        dur = (
-                            timeline.end_time.total_seconds()
-                            if timeline.end_time
-                            else 0
-                        )
-                        print(f"    Position: {pos:.1f}s / {dur:.1f}s")
-                except Exception as e:
-                    print(f"    Error getting timeline: {e}")
+        async def check_media_sessions():
+            # Awaited on the event loop instead of blocking on get_results()
+            manager = await MediaManager.request_async()
+            sessions = manager.get_sessions()
+
+            print(f"Found {len(sessions)} media sessions")
+            for i, session in enumerate(sessions):
+                app_id = session.source_app_user_model_id or ""
+                print(f"  Session {i}: {app_id}")
+
+                if "spotify" in app_id.lower():
+                    print("  ✓ Spotify found in Media Session API!")
+                    try:
+                        timeline = session.get_timeline_properties()
+                        if timeline:
+                            pos = (
+                                timeline.position.total_seconds()
+                                if timeline.position
+                                else 0
+                            )
+                            dur = (
+                                timeline.end_time.total_seconds()
+                                if timeline.end_time
+                                else 0
+                            )
+                            print(f"    Position: {pos:.1f}s / {dur:.1f}s")
+                    except Exception as e:
+                        print(f"    Error getting timeline: {e}")
+
+        asyncio.run(check_media_sessions())
     except Exception as e:
         print(f"Error checking Media Session API: {e}")
 else: